@@ -0,0 +1,233 @@
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Headless drivers must be chosen before pygame initialises, in every worker process
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+ENEMY_FIELDS = {"health": 1, "speed": 2}  # Tunable ENEMY_TYPES columns
+WEAPON_FIELDS = {"speed": 0, "damage": 1, "range": 2, "shoot_delay": 3}  # Tunable WEAPON_STATS columns
+PILOTS = ["scripted", "auto"]
+AUTO_FIRE_ANGLE = 10  # Degrees off target the autopilot still fires at
+AUTO_CHASE_DISTANCE = 250  # The autopilot closes in on targets further away than this
+GAMES_PER_TASK = 8  # Games sent to a worker at a time, amortises the pickling round trip
+
+game = None  # The game module, imported once per worker process
+defaults = None  # Untuned stat tables, restored before every game
+
+# Pilot that turns towards the nearest enemy, fires when lined up and closes in on distant targets
+class AutoPilot:
+    def __init__(self, module):
+        self.game = module
+
+    def get_pressed(self):
+        g = self.game
+        ship = g.player
+        if not g.enemies:
+            return g.KeyState((pygame.K_SPACE,))
+        x, y = ship.rect.center
+        target = min(g.enemies, key=lambda e: (e.rect.centerx - x) ** 2 + (e.rect.centery - y) ** 2)
+        dx = target.rect.centerx - x
+        dy = target.rect.centery - y
+
+        # Ships face (-sin, -cos) of their angle, so the bearing of a point is atan2(-dx, -dy)
+        bearing = math.degrees(math.atan2(-dx, -dy))
+        diff = (bearing - ship.angle + 180) % 360 - 180
+        keys = []
+        if diff > 0:
+            keys.append(pygame.K_a)
+        elif diff < 0:
+            keys.append(pygame.K_d)
+        if abs(diff) < AUTO_FIRE_ANGLE:
+            keys.append(pygame.K_SPACE)
+        if math.hypot(dx, dy) > AUTO_CHASE_DISTANCE:
+            keys.append(pygame.K_w)
+        return g.KeyState(keys)
+
+# Function to bring the sprite atlas up to date before any worker starts, so the workers only ever read it
+def prepare_atlas(module):
+    if not module.SPRITE_ATLAS:
+        return False
+    try:
+        if module.build_atlas.is_stale(module.IMAGE_ASSETS):
+            module.build_atlas.build(module.IMAGE_ASSETS)
+            print(f"Rebuilt {module.build_atlas.ATLAS_IMAGE}")
+    except (OSError, ValueError, pygame.error) as e:
+        print(f"Could not rebuild {module.build_atlas.ATLAS_IMAGE}, workers load images separately: {e}")
+        return False
+    return True
+
+# Function to import the game in a worker and load its assets once, run by each process as it starts
+def init_worker(root, atlas):
+    global game, defaults
+    os.chdir(root)  # Asset paths are relative to the repository root
+    sys.path.insert(0, root)
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        import survival005
+        game = survival005
+        game.SPRITE_ATLAS = atlas  # Without a ready atlas every worker would try to build it at once
+        game.init_pygame(headless=True)
+        pygame.display.set_mode((1, 1))
+        game.assets.preload(game.IMAGE_ASSETS)
+    defaults = (dict(game.ENEMY_TYPES), dict(game.WEAPON_STATS))
+
+# Function to split a "name.field" parameter into its stat table, row and column
+def parse_parameter(parameter, enemy_types, weapon_stats):
+    name, _, field = parameter.partition(".")
+    if name in enemy_types and field in ENEMY_FIELDS:
+        return "enemy", name, ENEMY_FIELDS[field]
+    if name in weapon_stats and field in WEAPON_FIELDS:
+        return "weapon", name, WEAPON_FIELDS[field]
+    raise ValueError(f"unknown parameter {parameter!r}, expected <enemy type>.{'|'.join(ENEMY_FIELDS)} "
+                     f"or <weapon>.{'|'.join(WEAPON_FIELDS)}")
+
+# Function to write one configuration's overrides into the game's stat tables
+def apply_config(overrides):
+    enemy_types, weapon_stats = defaults
+    game.ENEMY_TYPES.update(enemy_types)
+    game.WEAPON_STATS.update(weapon_stats)
+    for parameter, value in overrides.items():
+        table, name, column = parse_parameter(parameter, enemy_types, weapon_stats)
+        stats = game.ENEMY_TYPES if table == "enemy" else game.WEAPON_STATS
+        row = list(stats[name])
+        row[column] = value
+        stats[name] = tuple(row)
+
+    # Pooled projectiles and the engine's per-type tables were built from the previous stats
+    for pool in game.pools.values():
+        pool.release_all()
+        pool.free.clear()
+    if game.projectile_engine.kinds is not None:
+        game.projectile_engine.load_kinds(game.projectile_engine.kinds)
+
+# Function to play one seeded game to the pilot's death or the time limit, returning its result row
+def play(job):
+    config, overrides, pilot, seed, max_ticks = job
+    apply_config(overrides)
+    game.rng.seed(seed)
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        game.use_input(AutoPilot(game) if pilot == "auto" else game.ScriptedInput(game.DEFAULT_INPUT_SCRIPT))
+        game.reset_game()
+        game.current_state = game.STATE_PLAYING
+        damage_taken = 0
+        health = game.player.health
+        ticks = 0
+        while ticks < max_ticks and game.current_state == game.STATE_PLAYING:
+            game.game_tick()
+            ticks += 1
+            if game.player.health < health:
+                damage_taken += health - game.player.health
+            health = game.player.health
+
+    return {
+        "config": config,
+        "pilot": pilot,
+        "seed": seed,
+        "survival_s": ticks / game.TICK_RATE,
+        "survived": game.current_state == game.STATE_PLAYING,
+        "kills": game.kills,
+        "score": game.score,
+        "wave": game.spawner.wave,
+        "damage_taken": damage_taken,
+        **overrides,
+    }
+
+# Function to play a batch of games in one worker
+def play_batch(jobs):
+    return [play(job) for job in jobs]
+
+# Function to expand "name.field=v1,v2" sweeps into the grid of every combination
+def sweep_configs(sweeps):
+    axes = []
+    for sweep in sweeps:
+        parameter, _, values = sweep.partition("=")
+        axes.append([(parameter, float(value)) for value in values.split(",")])
+    return [dict(combination) for combination in itertools.product(*axes)]
+
+# Function to list the games to play: every configuration with every pilot and seed
+def make_jobs(configs, pilots, seeds, first_seed, max_ticks):
+    jobs = []
+    for overrides in configs:
+        name = " ".join(f"{k}={v:g}" for k, v in overrides.items()) or "default"
+        for pilot in pilots:
+            for seed in range(first_seed, first_seed + seeds):
+                jobs.append((name, overrides, pilot, seed, max_ticks))
+    return jobs
+
+def write_csv(path, rows):
+    columns = []
+    for row in rows:
+        columns += [column for column in row if column not in columns]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def print_summary(rows):
+    print(f"{'config':<40}{'pilot':<10}{'games':>6}{'survival s':>12}{'kills':>8}{'damage':>9}{'survived':>10}")
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["config"], row["pilot"]), []).append(row)
+    for (config, pilot), games in groups.items():
+        print(f"{config:<40}{pilot:<10}{len(games):>6}"
+              f"{statistics.fmean(r['survival_s'] for r in games):>12.1f}"
+              f"{statistics.fmean(r['kills'] for r in games):>8.1f}"
+              f"{statistics.fmean(r['damage_taken'] for r in games):>9.0f}"
+              f"{sum(r['survived'] for r in games) / len(games):>10.0%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Play seeded headless games across every core and tabulate the outcomes per configuration")
+    parser.add_argument("--sweep", action="append", default=[], metavar="NAME.FIELD=V1,V2",
+                        help="stat values to sweep, e.g. gunner.health=100,160 or GreenLaser.damage=10,20; repeat for a grid")
+    parser.add_argument("--configs", metavar="JSON", help="file with a list of {\"name.field\": value} configurations")
+    parser.add_argument("--pilots", nargs="+", choices=PILOTS, default=PILOTS)
+    parser.add_argument("--seeds", type=int, default=100, help="games per configuration and pilot")
+    parser.add_argument("--first-seed", type=int, default=1)
+    parser.add_argument("--max-seconds", type=float, default=300, help="simulated time a surviving game is stopped at")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes, defaults to every core")
+    parser.add_argument("--output", default="balance.csv")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, root)
+    os.chdir(root)
+    import survival005
+
+    configs = sweep_configs(args.sweep)
+    if args.configs:
+        with open(args.configs) as f:
+            configs = json.load(f)
+    for overrides in configs:
+        for parameter in overrides:
+            parse_parameter(parameter, survival005.ENEMY_TYPES, survival005.WEAPON_STATS)
+
+    atlas = prepare_atlas(survival005)
+    jobs = make_jobs(configs, args.pilots, args.seeds, args.first_seed, int(args.max_seconds * survival005.TICK_RATE))
+    batches = [jobs[i:i + GAMES_PER_TASK] for i in range(0, len(jobs), GAMES_PER_TASK)]
+    start = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(args.workers, initializer=init_worker, initargs=(root, atlas)) as executor:
+        for batch in executor.map(play_batch, batches):
+            rows += batch
+    elapsed = time.perf_counter() - start
+
+    write_csv(args.output, rows)
+    print_summary(rows)
+    simulated = sum(row["survival_s"] for row in rows)
+    print(f"{len(rows)} games on {args.workers} workers in {elapsed:.1f} s "
+          f"({len(rows) / elapsed:.1f} games/s, {simulated / elapsed:.0f}x real time)")
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+import argparse
+import contextlib
+import gc
+import importlib
+import inspect
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import types
+
+# Headless drivers must be chosen before pygame initialises
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+DEFAULT_VERSIONS = ["survival003", "survival004", "survival005"]
+WEAPON_CLASSES = ["GreenLaser", "BlueLaser", "DumbMissile", "SmartMissile"]
+ENEMY_IMAGES = ["assets/enemy1.png", "assets/enemy2.png", "assets/enemy3.png", "assets/enemy4.png", "assets/enemy5.png"]
+MIN_REGRESSION_MS = 0.01  # Ignore slowdowns smaller than timer noise
+MEMORY_SAMPLE = 2000  # Objects created when measuring bytes per object
+CHURN_SAMPLE = 100000  # Group add and remove cycles timed per object type
+
+# Function to load a game version, older scripts run their game loop at import so only the code above it is executed
+def load_version(name):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), name + ".py")
+    with open(path) as f:
+        source = f.read()
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        if "if __name__ == \"__main__\":" in source:
+            module = importlib.import_module(name)
+            module.init_pygame(headless=True)
+            pygame.display.set_mode((module.SCREEN_WIDTH, module.SCREEN_HEIGHT))
+            module.assets.preload(module.IMAGE_ASSETS)
+        else:
+            module = types.ModuleType(name)
+            module.__file__ = path
+            exec(compile(source[:source.index("# Game loop")], path, "exec"), module.__dict__)
+    return module
+
+# Function to construct a weapon across the differing constructor signatures of each version
+def make_weapon(module, cls, x, y, angle, owner):
+    try:
+        return cls(x, y, angle, owner)
+    except TypeError:
+        return cls(x, y, angle)
+
+# Function to construct an enemy, older versions take no speed argument
+def make_enemy(module, image):
+    if "speed" in inspect.signature(module.Enemy.__init__).parameters:
+        return module.Enemy(image, 100, .05)
+    return module.Enemy(image, 100)
+
+# Function to build a scene with the requested number of enemies, projectiles and power-ups
+def build_scene(module, n_enemies, n_projectiles, n_power_ups, seed):
+    random.seed(seed)
+    if hasattr(module, "rng"):
+        module.rng.seed(seed)
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        if hasattr(module, "reset_game"):
+            module.reset_game()
+            module.current_state = module.STATE_PLAYING
+        else:
+            for group in ("all_sprites", "enemies", "lasers", "enemy_lasers", "power_ups"):
+                setattr(module, group, pygame.sprite.Group())
+            module.player = module.Player()
+            module.all_sprites.add(module.player)
+        module.player.health = math.inf  # Keep the scene alive for every timed frame
+
+        # Enemies, from the game's own spawner where it has one
+        for enemy in list(module.enemies):
+            enemy.kill()
+        while len(module.enemies) < n_enemies:
+            if hasattr(module, "create_enemies"):
+                before = len(module.enemies)
+                module.create_enemies()
+                if len(module.enemies) == before:
+                    break  # The spawn ring is full, more waves would never place an enemy
+            else:
+                image = ENEMY_IMAGES[len(module.enemies) % len(ENEMY_IMAGES)]
+                enemy = make_enemy(module, image)
+                enemy.rect.center = (random.randrange(module.SCREEN_WIDTH), random.randrange(module.SCREEN_HEIGHT))
+                module.all_sprites.add(enemy)
+                module.enemies.add(enemy)
+        spawner = getattr(module, "spawner", None)
+        if spawner is not None:
+            spawner.pending.clear()  # Enemies still queued would join the scene while it is timed
+        for enemy in module.enemies.sprites()[n_enemies:]:
+            enemy.kill()
+        for enemy in module.enemies:
+            enemy.start_shooting_time = math.inf  # Hold fire so the projectile count stays fixed
+
+        # Projectiles of every weapon type, alternating between player and enemy owned
+        weapon_classes = [getattr(module, name) for name in WEAPON_CLASSES if hasattr(module, name)]
+        engine = getattr(module, "projectile_engine", None)
+        templates = []
+        for cls in weapon_classes:
+            templates.append(make_weapon(module, cls, 0, 0, 0, module.Enemy))
+            for i in range(n_projectiles):
+                owner = module.Player if i % 2 == 0 else module.Enemy
+                x = random.randrange(module.SCREEN_WIDTH)
+                y = random.randrange(module.SCREEN_HEIGHT)
+                angle = random.uniform(0, 360)
+                if engine is not None and engine.enabled:
+                    side = module.PLAYER_SIDE if owner is module.Player else module.ENEMY_SIDE
+                    engine.spawn(cls, x, y, angle, side)
+                    continue
+                projectile = make_weapon(module, cls, x, y, angle, owner)
+                module.all_sprites.add(projectile)
+                if owner is module.Player:
+                    module.lasers.add(projectile)
+                else:
+                    module.enemy_lasers.add(projectile)
+
+        # Power-ups, alternating health and weapon drops
+        for i in range(n_power_ups):
+            x = random.randrange(module.SCREEN_WIDTH)
+            y = random.randrange(module.SCREEN_HEIGHT)
+            if i % 2 == 0:
+                power_up = module.HPPowerUp(x, y)
+            else:
+                power_up = module.WeaponPowerUp(x, y, templates[i % len(templates)])
+            module.all_sprites.add(power_up)
+            module.power_ups.add(power_up)
+
+    if len(module.enemies) < n_enemies:
+        print(f"Warning: {module.__name__} placed {len(module.enemies)} of {n_enemies} enemies, its spawn ring is full")
+
+# Function to list the timed phases of one frame, in the order play_game runs them
+def frame_phases(module, screen):
+    m = module
+    grid = getattr(m, "collision_grid", None)
+    kwargs = {"grid": grid} if grid is not None else {}
+    player_projectiles = getattr(m, "player_projectiles", lambda: m.lasers)
+    enemy_projectiles = getattr(m, "enemy_projectiles", lambda: m.enemy_lasers)
+    if hasattr(m, "update_world"):
+        phases = [("update", m.update_world)]
+    else:
+        phases = [("update", lambda: m.all_sprites.update())]
+    if grid is not None:
+        phases.append(("broadphase", lambda: grid.rebuild(m.all_sprites)))
+    phases += [
+        ("collide_player_enemies", lambda: m.check_collisions(m.player, m.enemies, **kwargs)),
+        ("collide_player_enemy_lasers", lambda: m.check_collisions(m.player, enemy_projectiles(), **kwargs)),
+        ("collide_enemies_lasers", lambda: m.check_collisions(m.enemies, player_projectiles(), **kwargs)),
+        ("collide_player_power_ups", lambda: m.check_collisions(m.player, m.power_ups, **kwargs)),
+    ]
+    if hasattr(m, "draw_world"):
+        phases.append(("draw", lambda: (screen.fill(m.BLACK), m.draw_world(screen, 1))))
+    elif hasattr(m, "draw_interpolated"):
+        phases.append(("draw", lambda: (screen.fill(m.BLACK), m.draw_interpolated(screen, m.all_sprites, 1))))
+    else:
+        phases.append(("draw", lambda: (screen.fill(m.BLACK), m.all_sprites.draw(screen))))
+    phases.append(("health_bars", lambda: draw_health_bars(m, screen)))
+    return phases
+
+# Function to draw every health bar the same way play_game does
+def draw_health_bars(module, screen):
+    if hasattr(module, "draw_health_bars"):
+        module.draw_health_bars(screen, [module.player] + module.enemies.sprites())
+        return
+    for sprite in [module.player] + module.enemies.sprites():
+        health_bar_rect = pygame.Rect(0, 0, 32, 6)
+        health_bar_rect.center = sprite.rect.center
+        health_bar_rect.y += module.HEALTH_BAR_Y_OFFSET
+        health_bar_rect.x += module.HEALTH_BAR_X_OFFSET
+        module.draw_health_bar(screen, health_bar_rect, min(sprite.health, sprite.max_health), sprite.max_health)
+
+# Function to measure the Python heap bytes each object from factory takes while live in two groups
+def bytes_per_object(module, factory, count):
+    group_class = getattr(module, "SlotGroup", pygame.sprite.Group)
+    groups = (group_class(), group_class())
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = []
+    for _ in range(count):
+        obj = factory()
+        for group in groups:
+            group.add(obj)
+        objects.append(obj)
+    used = tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(objects)
+    tracemalloc.stop()
+    return used / count
+
+# Function to measure the CPU microseconds of adding an object to two groups and killing it again
+def churn_time(module, obj, count):
+    group_class = getattr(module, "SlotGroup", pygame.sprite.Group)
+    groups = (group_class(), group_class())
+    start = time.process_time()
+    for _ in range(count):
+        for group in groups:
+            group.add(obj)
+        obj.kill()
+    return (time.process_time() - start) / count * 1e6
+
+# Function to report the memory footprint of a live projectile and enemy in a version
+def memory_footprint(module):
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        if hasattr(module, "reset_game"):
+            module.reset_game()
+        else:
+            module.player = module.Player()
+        footprint = {
+            "projectile_bytes": bytes_per_object(module, lambda: make_weapon(module, module.GreenLaser, 100, 100, 0, module.Player), MEMORY_SAMPLE),
+            "enemy_bytes": bytes_per_object(module, lambda: make_enemy(module, ENEMY_IMAGES[0]), MEMORY_SAMPLE),
+            "projectile_churn_us": churn_time(module, make_weapon(module, module.GreenLaser, 100, 100, 0, module.Player), CHURN_SAMPLE),
+        }
+    engine = getattr(module, "projectile_engine", None)
+    if engine is not None and engine.enabled:
+        footprint["engine_projectile_bytes"] = engine.row_bytes()
+    return footprint
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "median_ms": statistics.median(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "min_ms": ordered[0],
+    }
+
+# Function to time every phase of a version over several freshly built scenes
+def benchmark_version(name, args):
+    module = load_version(name)
+    if args.sprite_projectiles and hasattr(module, "projectile_engine"):
+        module.projectile_engine.enabled = False
+    screen = pygame.Surface((module.SCREEN_WIDTH, module.SCREEN_HEIGHT))
+    samples = {}
+    totals = []
+    for repeat in range(args.repeats):
+        build_scene(module, args.enemies, args.projectiles, args.power_ups, args.seed + repeat)
+        phases = frame_phases(module, screen)
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            for _ in range(args.frames):
+                if hasattr(module, "sim_clock"):
+                    module.sim_clock.advance()
+                frame_total = 0
+                for phase, run in phases:
+                    start = time.perf_counter()
+                    run()
+                    elapsed = (time.perf_counter() - start) * 1000
+                    samples.setdefault(phase, []).append(elapsed)
+                    frame_total += elapsed
+                totals.append(frame_total)
+
+    results = {phase: summarize(values) for phase, values in samples.items()}
+    results["frame"] = summarize(totals)
+    return results, memory_footprint(module)
+
+# Function to list phases that got slower than the baseline by more than the tolerance
+def find_regressions(current, baseline, tolerance):
+    regressions = []
+    for version, phases in current["results"].items():
+        for phase, stats in phases.items():
+            base = baseline["results"].get(version, {}).get(phase)
+            if base is None:
+                continue
+            now_ms = stats["median_ms"]
+            base_ms = base["median_ms"]
+            if now_ms > base_ms * (1 + tolerance) and now_ms - base_ms > MIN_REGRESSION_MS:
+                regressions.append((version, phase, base_ms, now_ms))
+    return regressions
+
+def print_results(report):
+    for version, phases in report["results"].items():
+        print(version)
+        for phase, stats in phases.items():
+            print(f"  {phase:<28} median {stats['median_ms']:8.3f} ms   p95 {stats['p95_ms']:8.3f} ms")
+        for name, value in report["memory"][version].items():
+            if name.endswith("_us"):
+                print(f"  {name:<28} {value:8.3f} us CPU")
+            else:
+                print(f"  {name:<28} {value:8.0f} bytes")
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the update, collision and render phases of each game version")
+    parser.add_argument("--versions", nargs="+", default=DEFAULT_VERSIONS)
+    parser.add_argument("--enemies", type=int, default=30)
+    parser.add_argument("--projectiles", type=int, default=50, help="live projectiles of each weapon type")
+    parser.add_argument("--power-ups", type=int, default=10)
+    parser.add_argument("--frames", type=int, default=120, help="timed frames per scene")
+    parser.add_argument("--repeats", type=int, default=3, help="freshly built scenes per version")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--sprite-projectiles", action="store_true", help="disable the NumPy projectile engine where a version has one")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag phases slower than this stored result")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown before flagging, as a fraction")
+    args = parser.parse_args()
+
+    # Asset paths in every version are relative to the repository root
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.getcwd())
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "enemies": args.enemies,
+            "projectiles": args.projectiles,
+            "power_ups": args.power_ups,
+            "frames": args.frames,
+            "repeats": args.repeats,
+            "seed": args.seed,
+        },
+        "results": {},
+        "memory": {},
+    }
+    for name in args.versions:
+        report["results"][name], report["memory"][name] = benchmark_version(name, args)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print_results(report)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.tolerance)
+        for version, phase, base_ms, now_ms in regressions:
+            print(f"REGRESSION {version} {phase}: {base_ms:.3f} ms -> {now_ms:.3f} ms (+{(now_ms / base_ms - 1) * 100:.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import glob
+import json
+import math
+import os
+
+import pygame
+
+ATLAS_IMAGE = "assets/atlas.png"
+ATLAS_INDEX = "assets/atlas.json"
+EXCLUDED = {"assets/title_screen.png"}  # Full-screen art is drawn once and gains nothing from packing
+
+# Function to list the sprite PNGs packed by default
+def default_sources():
+    return sorted(path for path in glob.glob("assets/*.png") if path not in EXCLUDED and path != ATLAS_IMAGE)
+
+# Function to pack rectangles into rows of a sheet, tallest first, returning each position and the sheet size
+def pack(sizes):
+    area = sum(w * h for w, h in sizes.values())
+    width = max(max(w for w, _ in sizes.values()), 2 ** math.ceil(math.log2(math.sqrt(area))))
+    positions = {}
+    x = y = row_height = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x + w > width:
+            x = 0
+            y += row_height
+            row_height = 0
+        positions[name] = (x, y)
+        x += w
+        row_height = max(row_height, h)
+    return positions, (width, y + row_height)
+
+# Function to check whether the atlas is missing, built from other files, or older than any source
+def is_stale(sources, image_path=ATLAS_IMAGE, index_path=ATLAS_INDEX):
+    if not os.path.exists(image_path) or not os.path.exists(index_path):
+        return True
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except ValueError:
+        return True  # A corrupt index is rebuilt like a missing one
+    if sorted(index) != sorted(sources):
+        return True
+    built = min(os.path.getmtime(image_path), os.path.getmtime(index_path))
+    return any(os.path.getmtime(path) > built for path in sources)
+
+# Function to pack the sources into one PNG and write the sub-rect of each as JSON
+def build(sources, image_path=ATLAS_IMAGE, index_path=ATLAS_INDEX):
+    images = {path: pygame.image.load(path) for path in sources}
+    positions, size = pack({path: image.get_size() for path, image in images.items()})
+
+    sheet = pygame.Surface(size, pygame.SRCALPHA, 32)
+    index = {}
+    for path in sources:
+        x, y = positions[path]
+        sheet.blit(images[path], (x, y))  # Palette colour keys become transparent pixels
+        index[path] = [x, y, *images[path].get_size()]
+
+    # Written beside the targets and swapped in, so a reader never sees a half-written file
+    image_temp = f"{image_path}.{os.getpid()}.tmp"
+    index_temp = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        with open(image_temp, "wb") as f:
+            pygame.image.save(sheet, f, image_path)  # The target's name picks the PNG encoder
+        with open(index_temp, "w") as f:
+            json.dump(index, f, indent=1)
+        os.replace(image_temp, image_path)
+        os.replace(index_temp, index_path)
+    finally:
+        for path in (image_temp, index_temp):
+            if os.path.exists(path):
+                os.remove(path)
+    return size
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the sprite PNGs into one atlas image with a JSON index")
+    parser.add_argument("sources", nargs="*", help="PNGs to pack, defaults to every sprite in assets/")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the atlas is up to date")
+    args = parser.parse_args()
+
+    # Surfaces can be created and saved without a window, the game sets its own driver when it imports this module
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    # Asset paths are relative to the repository root
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sources = args.sources or default_sources()
+    if not args.force and not is_stale(sources):
+        print(f"{ATLAS_IMAGE} is up to date")
+        return
+    width, height = build(sources)
+    print(f"Packed {len(sources)} images into {ATLAS_IMAGE} ({width}x{height})")
+
+if __name__ == "__main__":
+    main()
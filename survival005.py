@@ -4,19 +4,38 @@ import math
 import time
 import copy
 import sys
-
-# Initialize Pygame
-pygame.init()
-hit_sound1 = pygame.mixer.Sound("assets/hit1.flac")
-hit_sound2 = pygame.mixer.Sound("assets/hit2.flac")
-hit_sound3 = pygame.mixer.Sound("assets/hit3.flac")
-fire_sound1 = pygame.mixer.Sound("assets/fire1.flac")
-fire_sound2 = pygame.mixer.Sound("assets/fire2.flac")
-fire_sound3 = pygame.mixer.Sound("assets/fire3.flac")
-fire_sound4 = pygame.mixer.Sound("assets/fire4.flac")
-hp_sound = pygame.mixer.Sound("assets/hp1.flac")
-collision_sound = pygame.mixer.Sound("assets/collision.flac")
-explosion_sound = pygame.mixer.Sound("assets/explosion.flac")
+import os
+import argparse
+import contextlib
+import json
+import logging
+import logging.handlers
+import threading
+import struct
+import zlib
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+
+import build_atlas
+
+try:
+    import numpy as np
+except ImportError:  # Vectorized engines fall back to per-sprite updates
+    np = None
+
+# Function to initialize Pygame, headless runs use SDL's dummy video and audio drivers
+def init_pygame(headless=False):
+    global audio
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.init()
+
+    # Headless runs and machines without a sound device skip loading and mixing entirely
+    if not headless and pygame.mixer.get_init():
+        audio = AudioManager(SOUND_EFFECTS, AUDIO_VOICE_LIMITS)
+    else:
+        audio = NullAudio()
 
 # Constants
 SCREEN_WIDTH = 1600
@@ -24,6 +43,137 @@ SCREEN_HEIGHT = 1200
 ENEMY_SPAWN_DISTANCE = 500
 HEALTH_BAR_Y_OFFSET = -30
 HEALTH_BAR_X_OFFSET = -16
+HEALTH_BAR_WIDTH = 32
+HEALTH_BAR_HEIGHT = 6
+HEALTH_BAR_LEVELS = 32  # Pre-rendered fill levels, one per pixel of bar width
+
+# Timing
+TICK_RATE = 300  # Fixed simulation ticks per second
+MAX_FPS = 144  # Render frame cap, 0 for uncapped
+VSYNC = False  # Sync presentation to the display refresh
+MAX_FRAME_TIME = 0.25  # Longest frame fed to the simulation, avoids a catch-up spiral
+
+# Rendering
+DIRTY_RENDERING = True  # Push only the regions that changed instead of flipping the whole screen
+DIRTY_AREA_THRESHOLD = 0.35  # Fraction of the screen above which a full flip is used instead
+
+# Profiler
+PROFILER_HISTORY = 240  # Frames kept for the overlay graph and percentiles
+PROFILER_TOGGLE_KEY = pygame.K_F3
+PROFILER_GRAPH_MS = 33  # Frame time at the top of the overlay graph
+PROFILER_FONT_SIZE = 20
+TRACE_MAX_EVENTS = 500000  # Trace events kept for export, oldest are dropped first
+
+# Text and HUD
+TEXT_CACHE_SIZE = 256  # Rendered text surfaces kept before the least recently used is evicted
+HUD_VISIBLE = True
+HUD_TOGGLE_KEY = pygame.K_F2
+HUD_FONT_SIZE = 28
+HUD_MARGIN = 10
+HUD_FPS_FRAMES = 60  # Frames averaged for the FPS readout
+
+# Game event log
+EVENT_DEBUG = 10
+EVENT_INFO = 20
+EVENT_WARNING = 30
+EVENT_LEVELS = {"debug": EVENT_DEBUG, "info": EVENT_INFO, "warning": EVENT_WARNING}
+EVENT_LOG_BUFFER = 65536  # Events held in memory between flushes, oldest are dropped when full
+EVENT_LOG_FLUSH_INTERVAL = 0.5  # Seconds between background flushes
+EVENT_LOG_MAX_BYTES = 10 * 1024 * 1024  # Size at which the log file rotates
+EVENT_LOG_BACKUPS = 3  # Rotated files kept
+
+# Collision detection
+COLLISION_CELL_SIZE = 48  # Spatial hash cell, about the largest rotated sprite (a 32x32 ship is ~46px)
+MASK_COLLISIONS = True  # Confirm rect overlaps with cached frame masks, or a segment-vs-circle test for beams
+HIT_CIRCLE_COVERAGE = 0.9  # Share of a ship's opaque pixels inside the circle beams are tested against
+
+# Object pools for projectiles and explosions
+POOL_GROW = "grow"  # Allocate past capacity, extras are dropped again when they die
+POOL_DROP = "drop"  # Refuse the request, so the shot is not fired
+POOL_RECYCLE = "recycle"  # Kill the oldest live object and hand it out again
+POOL_CAPACITY = 2048  # Objects each pool keeps track of
+POOL_OVERFLOW = POOL_GROW
+
+# Smart missile targeting
+TARGET_CELL_SIZE = 200  # Grid cell of the nearest-enemy index
+SMART_MISSILE_RETARGET_TICKS = 30  # Ticks a player missile keeps its target before looking again
+SMART_MISSILE_RETARGET_RATIO = 0.75  # Switch only to a target this much closer than the current one
+
+# Projectile engine
+PROJECTILE_ENGINE = np is not None  # Simulate projectiles as NumPy arrays instead of sprites
+PROJECTILE_CAPACITY = 1024  # Initial array size, doubled whenever it fills
+PLAYER_SIDE = 0
+ENEMY_SIDE = 1
+
+# Enemy waves
+WAVES = [  # Enemies of each ENEMY_TYPES entry per wave, the last wave repeats with growing counts
+    {"rammer": 3, "gunner": 3, "lancer": 3, "bomber": 3, "hunter": 3},
+    {"rammer": 5, "gunner": 4, "lancer": 3, "bomber": 3, "hunter": 3},
+    {"rammer": 4, "gunner": 4, "lancer": 4, "bomber": 4, "hunter": 4},
+    {"rammer": 6, "gunner": 4, "lancer": 4, "bomber": 5, "hunter": 5},
+]
+WAVE_COUNT_STEP = 1  # Extra enemies of each type per wave past the end of WAVES
+WAVE_HEALTH_STEP = 0.15  # Extra enemy health per wave after the first, as a fraction
+WAVE_SPEED_STEP = 0.05  # Extra enemy speed per wave after the first, as a fraction
+WAVE_DELAY = 3  # Seconds between clearing a wave and the next one arriving
+SPAWNS_PER_TICK = 1  # Enemies placed per tick while a wave is arriving
+SPAWN_RANDOM_TRIES = 8  # Random free-cell probes before scanning the spawn ring in order
+
+# Weapon stats: speed (px per tick), damage, range (px) and enemy shoot delay (s)
+WEAPON_STATS = {
+    "GreenLaser": (1, 20, math.inf, 4),
+    "BlueLaser": (.5, 40, math.inf, 8),
+    "DumbMissile": (0.8, 50, 500, 6),
+    "SmartMissile": (0.3, 50, 800, 10),
+}
+
+# Input recording and replay
+REPLAY_MAGIC = b"SSRP"
+REPLAY_VERSION = 3  # Version 2 confirms hits with the narrowphase, 3 picks a spawn cell before building the enemy
+REPLAY_KEYS = (pygame.K_w, pygame.K_a, pygame.K_d, pygame.K_SPACE)  # Keys the player reads, one bit each
+REPLAY_CHECKSUM_TICKS = 300  # Ticks between recorded state checksums
+
+# Sprite images decoded once at startup
+IMAGE_ASSETS = [
+    "assets/player.png",
+    "assets/enemy1.png",
+    "assets/enemy2.png",
+    "assets/enemy3.png",
+    "assets/enemy4.png",
+    "assets/enemy5.png",
+    "assets/missile1.png",
+    "assets/missile2.png",
+    "assets/explosion.png",
+    "assets/hp1.png",
+    "assets/pu_greenlaser.png",
+    "assets/pu_bluelaser.png",
+    "assets/pu_missile1.png",
+    "assets/pu_missile2.png",
+]
+SPRITE_ATLAS = True  # Load IMAGE_ASSETS as subsurfaces of one packed sheet, rebuilt when a source PNG changes
+
+# Sound effects: path, voice category, priority and minimum seconds between plays
+SOUND_EFFECTS = {
+    "hit_green": ("assets/hit1.flac", "hit", 1, 0.05),
+    "hit_blue": ("assets/hit2.flac", "hit", 1, 0.05),
+    "hit_missile": ("assets/hit3.flac", "hit", 2, 0.05),
+    "fire_green": ("assets/fire1.flac", "fire", 0, 0.04),
+    "fire_blue": ("assets/fire2.flac", "fire", 0, 0.04),
+    "fire_dumb_missile": ("assets/fire3.flac", "fire", 1, 0.06),
+    "fire_smart_missile": ("assets/fire4.flac", "fire", 1, 0.06),
+    "hp": ("assets/hp1.flac", "pickup", 3, 0),
+    "collision": ("assets/collision.flac", "impact", 3, 0.1),
+    "explosion": ("assets/explosion.flac", "explosion", 2, 0.03),
+}
+AUDIO_VOICE_LIMITS = {"fire": 4, "hit": 4, "explosion": 3, "impact": 2, "pickup": 1}  # Mixer channels per category
+AUDIO_PLAYER_PRIORITY = 2  # Added to the player's own sounds so enemy fire steals from them last
+AUDIO_FALLOFF_START = 300  # Distance from the player where sounds start getting quieter
+AUDIO_FALLOFF_END = 1000  # Distance at which sounds are silent and not played at all
+
+# Rotation cache
+ROTATION_STEPS = 360  # Quantized angles rendered per image
+ROTATION_CACHE_SIZE = 4096  # Rotated frames kept before the least recently used is evicted
+HEADING_STEPS = 3600  # Quantized headings in the movement sin/cos table, 0.1 degrees apart
 
 # Game States
 STATE_TITLE = 0
@@ -31,171 +181,1458 @@ STATE_PLAYING = 1
 STATE_GAME_OVER = 2
 current_state = STATE_TITLE  # Start with the title screen
 
+# Sine and cosine of every quantized heading, so movement needs no per-tick trig
+SIN_TABLE = [math.sin(math.radians(i * 360 / HEADING_STEPS)) for i in range(HEADING_STEPS)]
+COS_TABLE = [math.cos(math.radians(i * 360 / HEADING_STEPS)) for i in range(HEADING_STEPS)]
+
+# Function to look up (sin, cos) of an angle in degrees
+def heading_vector(angle):
+    i = round(angle * HEADING_STEPS / 360) % HEADING_STEPS
+    return SIN_TABLE[i], COS_TABLE[i]
+
+# Simulation clock shared by every movement and cooldown timer
+class SimulationClock:
+    def __init__(self, tick_rate):
+        self.tick_rate = tick_rate
+        self.dt = 1 / tick_rate
+        self.ticks = 0
+        self.accumulator = 0
+
+    def advance(self):
+        self.ticks += 1
+
+    # Simulation time in seconds, independent of wall-clock time
+    def now(self):
+        return self.ticks * self.dt
+
+    def reset(self):
+        self.ticks = 0
+        self.accumulator = 0
+
+sim_clock = SimulationClock(TICK_RATE)
+
+# Single random stream for all gameplay, seeding it makes a run reproducible
+rng = random.Random()
+
+# Per-frame phase timer with an on-screen overlay and Chrome trace-event export
+class FrameProfiler:
+    def __init__(self, history):
+        self.frame_times = deque(maxlen=history)  # Milliseconds per frame
+        self.phase_times = {}  # Milliseconds spent in each phase during the last frame
+        self.current = {}
+        self.trace = None  # Trace events, only kept once tracing is started
+        self.visible = False
+        self.panel = None  # Overlay surface, reused across frames
+        self.origin = time.perf_counter()
+        self.frame_start = self.origin
+
+    def start_trace(self):
+        self.trace = deque(maxlen=TRACE_MAX_EVENTS)
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+        self.current = {}
+
+    def end_frame(self):
+        end = time.perf_counter()
+        self.frame_times.append((end - self.frame_start) * 1000)
+        self.phase_times = self.current
+        self.add_trace_event("frame", self.frame_start, end)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Recorded even when the phase raises, so the sample is not lost
+            end = time.perf_counter()
+            self.current[name] = self.current.get(name, 0) + (end - start) * 1000
+            self.add_trace_event(name, start, end)
+
+    def add_trace_event(self, name, start, end):
+        if self.trace is not None:
+            self.trace.append({
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": 1,
+                "tid": 1,
+            })
+
+    def percentile(self, p):
+        if not self.frame_times:
+            return 0
+        ordered = sorted(self.frame_times)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def draw(self, surf, counts):
+        lines = [f"frame p50 {self.percentile(50):.2f}  p95 {self.percentile(95):.2f}  p99 {self.percentile(99):.2f} ms"]
+        lines += [f"{name:<28}{ms:7.3f} ms" for name, ms in self.phase_times.items()]
+        lines += [f"{name}: {count}" for name, count in counts.items()]
+
+        texts = [text_cache.render(line, PROFILER_FONT_SIZE, WHITE) for line in lines]
+
+        graph_height = 60
+        width = max([360] + [text.get_width() + 12 for text in texts])
+        height = 16 * len(lines) + graph_height + 12
+        # Only widened, so a line that shrinks and grows again does not reallocate it every frame
+        if self.panel is None or self.panel.get_height() != height or self.panel.get_width() < width:
+            self.panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel = self.panel
+        panel.fill((0, 0, 0, 160))
+        for i, text in enumerate(texts):
+            panel.blit(text, (6, 4 + 16 * i))
+
+        # Rolling frame-time graph, newest frame on the right
+        base = panel.get_height() - 6
+        for x, ms in enumerate(self.frame_times):
+            height = min(graph_height, ms / PROFILER_GRAPH_MS * graph_height)
+            color = GREEN if ms < 1000 / 60 else (255, 64, 64)
+            pygame.draw.line(panel, color, (6 + x, base), (6 + x, base - height))
+        return surf.blit(panel, (10, 10))
+
+    def export_trace(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": list(self.trace or ()), "displayTimeUnit": "ms"}, f)
+
+profiler = FrameProfiler(PROFILER_HISTORY)
+
+# Rendered text surfaces keyed by font, size, text and colour, fonts are loaded once per size
+class TextCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size, name=None):
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = pygame.font.Font(name, size)
+            self.fonts[(name, size)] = font
+        return font
+
+    def render(self, text, size, color, name=None):
+        key = (name, size, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.font(size, name).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+text_cache = TextCache(TEXT_CACHE_SIZE)
+
+# Heads-up readout in the top-right corner, each line is only re-rendered when its value changes
+class Hud:
+    def __init__(self, size):
+        self.size = size
+        self.visible = HUD_VISIBLE
+        self.frame_times = deque(maxlen=HUD_FPS_FRAMES)
+        self.lines = {}  # Label -> (value, rendered line)
+
+    def frame(self, frame_time):
+        self.frame_times.append(frame_time)
+
+    def fps(self):
+        total = sum(self.frame_times)
+        return round(len(self.frame_times) / total) if total else 0
+
+    # Blit every line and return the rects drawn, for the dirty renderer
+    def draw(self, surf, values):
+        rects = []
+        y = HUD_MARGIN
+        for label, value in values.items():
+            line = self.lines.get(label)
+            if line is None or line[0] != value:
+                line = (value, text_cache.render(f"{label}: {value}", self.size, WHITE))
+                self.lines[label] = line
+            image = line[1]
+            rects.append(surf.blit(image, (SCREEN_WIDTH - image.get_width() - HUD_MARGIN, y)))
+            y += image.get_height()
+        return rects
+
+hud = Hud(HUD_FONT_SIZE)
+
+# Structured game-event log: records go to a ring buffer and a background thread writes them as JSON Lines
+class GameEventLog:
+    def __init__(self):
+        self.enabled = False  # Call sites check this first, so a disabled log costs one attribute read
+        self.level = EVENT_INFO
+        self.sample_rates = {}  # Event kind -> keep one in every N
+        self.sample_counts = {}
+        self.buffer = deque(maxlen=EVENT_LOG_BUFFER)
+        self.dropped = 0
+        self.logger = logging.getLogger("survival005.events")
+        self.logger.propagate = False
+        self.handler = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def open(self, path, level=EVENT_INFO, sample_rates=None):
+        self.handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=EVENT_LOG_MAX_BYTES, backupCount=EVENT_LOG_BACKUPS)
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(EVENT_DEBUG)
+        self.level = level
+        self.sample_rates = dict(sample_rates or {})
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="event-log", daemon=True)
+        self.thread.start()
+        self.enabled = True
+
+    def emit(self, kind, level, **fields):
+        if level < self.level:
+            return
+        rate = self.sample_rates.get(kind, 1)
+        if rate > 1:
+            count = self.sample_counts.get(kind, 0) + 1
+            self.sample_counts[kind] = count
+            if count % rate:
+                return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append((sim_clock.ticks, kind, level, fields))
+
+    def run(self):
+        while not self.stop_event.wait(EVENT_LOG_FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        while self.buffer:
+            tick, kind, level, fields = self.buffer.popleft()
+            record = {"tick": tick, "time": round(tick * sim_clock.dt, 4), "event": kind,
+                      "level": logging.getLevelName(level).lower()}
+            record.update(fields)
+            self.logger.log(level, json.dumps(record))
+
+    def close(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        self.stop_event.set()
+        self.thread.join()
+        self.flush()
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+
+event_log = GameEventLog()
+
+# Tracks the screen regions drawn each frame and presents only those, falling back to a full flip
+class DirtyRenderer:
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.rects = []  # Regions drawn this frame
+        self.previous = []  # Regions drawn last frame, erased before drawing again
+        self.full_frames = 1  # Frames that still need a full clear and flip
+        self.full_presents = 0
+        self.dirty_presents = 0
+
+    # Force a full redraw, used by screens that paint the whole window
+    def invalidate(self):
+        self.full_frames = 2  # This frame and the first frame drawn over it
+
+    def add(self, rect):
+        self.rects.append(rect)
+
+    def add_all(self, rects):
+        self.rects.extend(rects)
+
+    # Erase last frame's sprites, or the whole screen after an invalidate
+    def clear(self, screen):
+        if self.full_frames or not self.enabled:
+            screen.fill(BLACK)
+        else:
+            for rect in self.previous:
+                screen.fill(BLACK, rect)
+
+    def present(self):
+        dirty = self.previous + self.rects
+        area = sum(rect.width * rect.height for rect in dirty)  # Overlaps counted twice, errs towards a full flip
+        if not self.enabled or self.full_frames or area > DIRTY_AREA_THRESHOLD * SCREEN_WIDTH * SCREEN_HEIGHT:
+            pygame.display.flip()
+            self.full_presents += 1
+        else:
+            pygame.display.update(dirty)
+            self.dirty_presents += 1
+        self.end_frame()
+
+    # Roll this frame's regions over without touching the display, used for offscreen rendering
+    def end_frame(self):
+        self.previous = self.rects
+        self.rects = []
+        if self.full_frames:
+            self.full_frames -= 1
+
+renderer = DirtyRenderer(DIRTY_RENDERING)
+
+# Live keyboard state
+class KeyboardInput:
+    def get_pressed(self):
+        return pygame.key.get_pressed()
+
+# Pressed-key snapshot indexable like pygame.key.get_pressed()
+class KeyState:
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+# Input that replays a looping list of (ticks, keys) steps, one step per simulation tick
+class ScriptedInput:
+    def __init__(self, steps):
+        self.steps = [(ticks, KeyState(keys)) for ticks, keys in steps]
+        self.period = sum(ticks for ticks, _ in self.steps)
+        self.tick = 0
+
+    def get_pressed(self):
+        t = self.tick % self.period
+        self.tick += 1
+        for ticks, keys in self.steps:
+            if t < ticks:
+                return keys
+            t -= ticks
+
+# Default soak-test pilot: fly, turn and fire continuously
+DEFAULT_INPUT_SCRIPT = [
+    (300, (pygame.K_w, pygame.K_SPACE)),
+    (150, (pygame.K_a, pygame.K_SPACE)),
+    (120, (pygame.K_SPACE,)),
+    (200, (pygame.K_d, pygame.K_w, pygame.K_SPACE)),
+]
+
+# Function to pack the replay keys of a get_pressed() result into a bitmask
+def encode_keys(keys):
+    return sum(1 << bit for bit, key in enumerate(REPLAY_KEYS) if keys[key])
+
+# Input that passes another source through while recording each tick's keys and periodic state checksums
+class InputRecorder:
+    def __init__(self, seed, sprite_projectiles):
+        self.seed = seed
+        self.sprite_projectiles = sprite_projectiles
+        self.source = None
+        self.runs = []  # [ticks, key mask], consecutive ticks with the same keys share a run
+        self.checksums = []
+        self.ticks = 0
+
+    def get_pressed(self):
+        keys = self.source.get_pressed()
+        mask = encode_keys(keys)
+        if self.runs and self.runs[-1][1] == mask and self.runs[-1][0] < 0xFFFF:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, mask])
+        return keys
+
+    def end_tick(self):
+        self.ticks += 1
+        if self.ticks % REPLAY_CHECKSUM_TICKS == 0:
+            self.checksums.append((self.ticks, state_checksum()))
+
+    # Header, run-length encoded keys, then (tick, checksum) pairs, all little-endian
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(struct.pack("<4sBBHQ", REPLAY_MAGIC, REPLAY_VERSION, self.sprite_projectiles, TICK_RATE, self.seed))
+            f.write(struct.pack("<I", len(self.runs)))
+            for ticks, mask in self.runs:
+                f.write(struct.pack("<HB", ticks, mask))
+            f.write(struct.pack("<I", len(self.checksums)))
+            for tick, checksum in self.checksums:
+                f.write(struct.pack("<II", tick, checksum))
+
+# Input read back from a recording, checking the simulation against its checksums as it goes
+class InputReplay:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, sprite_projectiles, tick_rate, self.seed = struct.unpack_from("<4sBBHQ", data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay")
+        if tick_rate != TICK_RATE:
+            raise ValueError(f"{path} was recorded at {tick_rate} ticks/s, the game runs at {TICK_RATE}")
+        self.sprite_projectiles = bool(sprite_projectiles)
+        offset = struct.calcsize("<4sBBHQ")
+
+        (n_runs,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        self.masks = bytearray()
+        for ticks, mask in struct.iter_unpack("<HB", data[offset:offset + n_runs * 3]):
+            self.masks += bytes([mask]) * ticks
+        offset += n_runs * 3
+
+        (n_checksums,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        self.checksums = dict(struct.iter_unpack("<II", data[offset:offset + n_checksums * 8]))
+
+        self.states = [KeyState(key for bit, key in enumerate(REPLAY_KEYS) if mask >> bit & 1)
+                       for mask in range(1 << len(REPLAY_KEYS))]
+        self.cursor = 0
+        self.ticks = 0
+        self.verified = 0
+        self.desync = None  # (tick, recorded, actual) of the first mismatch
+
+    @property
+    def finished(self):
+        return self.cursor >= len(self.masks)
+
+    def get_pressed(self):
+        mask = self.masks[self.cursor]
+        self.cursor += 1
+        return self.states[mask]
+
+    def end_tick(self):
+        self.ticks += 1
+        recorded = self.checksums.get(self.ticks)
+        if recorded is None:
+            return
+        actual = state_checksum()
+        if actual == recorded:
+            self.verified += 1
+        elif self.desync is None:
+            self.desync = (self.ticks, recorded, actual)
+
+input_source = KeyboardInput()
+input_tape = None  # Active InputRecorder or InputReplay, told when each tick ends
+
+# Function to switch the player's input, routing it through the recorder when one is active
+def use_input(source):
+    global input_source
+    if isinstance(input_tape, InputRecorder):
+        input_tape.source = source
+        source = input_tape
+    input_source = source
+
+# One pre-rotated image with its rect, the collision mask is built on first use
+class RotatedFrame:
+    def __init__(self, image):
+        self.image = image
+        self.rect = image.get_rect()
+        self._mask = None
+
+    @property
+    def mask(self):
+        if self._mask is None:
+            self._mask = pygame.mask.from_surface(self.image)
+        return self._mask
+
+# Shared cache of rotated frames keyed by image and quantized angle
+class RotationCache:
+    def __init__(self, steps, capacity):
+        self.steps = steps
+        self.capacity = capacity
+        self.frames = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, image, angle):
+        step = round(angle * self.steps / 360) % self.steps
+        frame = self.frames.get((key, step))
+        if frame is not None:
+            self.frames.move_to_end((key, step))
+            self.hits += 1
+            return frame
+
+        self.misses += 1
+        frame = RotatedFrame(pygame.transform.rotozoom(image, step * 360 / self.steps, 1))
+        self.frames[(key, step)] = frame
+        if len(self.frames) > self.capacity:
+            self.frames.popitem(last=False)  # Evict the least recently used frame
+        return frame
+
+    # Render every quantized angle of an image ahead of time
+    def prerender(self, key, image):
+        for step in range(self.steps):
+            self.get(key, image, step * 360 / self.steps)
+
+rotation_cache = RotationCache(ROTATION_STEPS, ROTATION_CACHE_SIZE)
+
+# Function to test whether a beam, a segment through (x, y) along its heading, touches a circle
+def beam_hits_circle(x, y, angle, half_length, half_width, cx, cy, radius):
+    sin, cos = heading_vector(angle)
+    # Distance along the beam to the point nearest the circle's centre, clamped to the beam's ends
+    t = max(-half_length, min(half_length, -(cx - x) * sin - (cy - y) * cos))
+    dx = cx - (x - t * sin)
+    dy = cy - (y - t * cos)
+    reach = radius + half_width
+    return dx * dx + dy * dy <= reach * reach
+
+# Confirms broadphase rect hits: beams against a ship's hit circle, everything else by frame masks
+class Narrowphase:
+    def __init__(self):
+        self.radii = {}  # Hit circle radius per image key
+        self.candidates = 0
+        self.confirmed = 0
+
+    # Radius around an image's centre holding HIT_CIRCLE_COVERAGE of its opaque pixels, the same at every rotation
+    def radius(self, key, image):
+        radius = self.radii.get(key)
+        if radius is None:
+            mask = pygame.mask.from_surface(image)
+            w, h = mask.get_size()
+            distances = sorted(math.hypot(x + .5 - w / 2, y + .5 - h / 2)
+                               for x in range(w) for y in range(h) if mask.get_at((x, y)))
+            radius = distances[int(HIT_CIRCLE_COVERAGE * (len(distances) - 1))] if distances else 0
+            self.radii[key] = radius
+        return radius
+
+    # Whether sprite and other, whose rects overlap, really touch
+    def touches(self, sprite, other):
+        target, shot = (sprite, other) if isinstance(other, Weapon) else (other, sprite)
+        if isinstance(shot, Weapon) and shot.beam and isinstance(target, Entity):
+            image = shot.original_image
+            cx, cy = target.rect.center
+            return beam_hits_circle(shot.rect.centerx, shot.rect.centery, shot.angle,
+                                    image.get_height() / 2, image.get_width() / 2,
+                                    cx, cy, self.radius(target.image_key, target.original_image))
+        if isinstance(sprite, (Entity, Weapon)) and isinstance(other, (Entity, Weapon)):
+            return collide_frames(sprite, other)
+        return True  # Power-ups are collected on a rect overlap
+
+    # Broadphase candidates that really touch sprite, in their original order
+    def confirm(self, sprite, candidates):
+        self.candidates += len(candidates)
+        hits = [other for other in candidates if self.touches(sprite, other)]
+        self.confirmed += len(hits)
+        return hits
+
+narrowphase = Narrowphase()
+
+# Registry that decodes each image file once and hands out the shared surface
+class AssetManager:
+    def __init__(self):
+        self.images = {}
+        self.load_times = {}  # Seconds spent loading each asset
+
+    def image(self, path):
+        image = self.images.get(path)
+        if image is None:
+            start = time.perf_counter()
+            image = pygame.image.load(path).convert_alpha()
+            self.load_times[path] = time.perf_counter() - start
+            self.images[path] = image
+        return image
+
+    # Shared solid colour surface, used for the laser beams
+    def solid(self, size, color):
+        key = ("solid", size, color)
+        image = self.images.get(key)
+        if image is None:
+            image = pygame.Surface(size)
+            image.fill(color)
+            self.images[key] = image
+        return image
+
+    # Decode image files without touching the display, so it can run on a worker thread
+    def read(self, paths, progress=None):
+        if SPRITE_ATLAS:
+            atlas = self.read_atlas(paths)
+            if atlas is not None:
+                if progress:
+                    progress(len(paths), len(paths), build_atlas.ATLAS_IMAGE)
+                return atlas
+        decoded = {}
+        for i, path in enumerate(paths, 1):
+            start = time.perf_counter()
+            decoded[path] = pygame.image.load(path)
+            self.load_times[path] = time.perf_counter() - start
+            if progress:
+                progress(i, len(paths), path)
+        return decoded, None
+
+    # Decode the packed sheet once, rebuilding it first when a source image changed
+    def read_atlas(self, paths):
+        start = time.perf_counter()
+        try:
+            if build_atlas.is_stale(paths):
+                build_atlas.build(paths)
+                print(f"Rebuilt {build_atlas.ATLAS_IMAGE}")
+            sheet = pygame.image.load(build_atlas.ATLAS_IMAGE)
+            with open(build_atlas.ATLAS_INDEX) as f:
+                index = json.load(f)
+            if not all(sheet.get_rect().contains(rect) for rect in index.values()):
+                raise ValueError("index does not match the sheet")
+        except (OSError, ValueError, pygame.error) as e:
+            print(f"Could not read {build_atlas.ATLAS_IMAGE}, loading images separately: {e}")
+            return None
+        self.load_times[build_atlas.ATLAS_IMAGE] = time.perf_counter() - start
+        return {build_atlas.ATLAS_IMAGE: sheet}, index
+
+    # Convert decoded images for the display on the main thread, atlas entries become subsurfaces of the sheet
+    def install(self, decoded, index):
+        for key, image in decoded.items():
+            start = time.perf_counter()
+            image = image.convert_alpha()
+            self.load_times[key] += time.perf_counter() - start
+            if index is None:
+                self.images[key] = image
+            else:
+                for path, rect in index.items():
+                    self.images[path] = image.subsurface(rect)
+
+    def preload(self, paths, progress=None):
+        self.install(*self.read(paths, progress))
+
+    def report(self):
+        total = sum(self.load_times.values())
+        for path, seconds in sorted(self.load_times.items(), key=lambda item: -item[1]):
+            print(f"{seconds * 1000:8.2f} ms  {path}")
+        print(f"{total * 1000:8.2f} ms  total ({len(self.load_times)} assets)")
+
+assets = AssetManager()
+
+# Plays sound effects on per-category mixer channels with cooldowns, voice stealing and distance falloff
+class AudioManager:
+    def __init__(self, effects, voice_limits):
+        self.sounds = {}
+        self.effects = effects
+        self.last_played = {}
+        pygame.mixer.set_num_channels(sum(voice_limits.values()))
+        pygame.mixer.set_reserved(sum(voice_limits.values()))  # Only this manager starts sounds
+        self.voices = {}  # Category -> [channel, priority, start time]
+        index = 0
+        for category, limit in voice_limits.items():
+            self.voices[category] = [[pygame.mixer.Channel(index + i), 0, 0] for i in range(limit)]
+            index += limit
+
+    # Decode every effect, safe to run on the startup worker thread
+    def load(self):
+        for name, (path, _, _, _) in self.effects.items():
+            start = time.perf_counter()
+            self.sounds[name] = pygame.mixer.Sound(path)
+            assets.load_times[path] = time.perf_counter() - start
+
+    # Volume for a sound at position, 1 at the listener fading to 0 at AUDIO_FALLOFF_END
+    def volume(self, position, listener):
+        if position is None or listener is None:
+            return 1
+        distance = math.hypot(position[0] - listener[0], position[1] - listener[1])
+        if distance <= AUDIO_FALLOFF_START:
+            return 1
+        return max(0, 1 - (distance - AUDIO_FALLOFF_START) / (AUDIO_FALLOFF_END - AUDIO_FALLOFF_START))
+
+    # Position and listener are screen points, a sound without both plays at full volume
+    def play(self, name, position=None, priority=0, listener=None):
+        sound = self.sounds.get(name)
+        if sound is None:
+            return  # Still loading
+        _, category, base_priority, cooldown = self.effects[name]
+        now = time.perf_counter()
+        if now - self.last_played.get(name, -math.inf) < cooldown:
+            return
+        volume = self.volume(position, listener)
+        if volume <= 0:
+            return
+        priority += base_priority
+
+        # A free channel, otherwise steal the lowest-priority, oldest voice that is not above this one
+        voices = self.voices[category]
+        voice = next((v for v in voices if not v[0].get_busy()), None)
+        if voice is None:
+            voice = min(voices, key=lambda v: (v[1], v[2]))
+            if voice[1] > priority:
+                return
+        voice[0].play(sound)
+        voice[0].set_volume(volume)
+        voice[1] = priority
+        voice[2] = now
+        self.last_played[name] = now
+
+# Stand-in used headless or without a sound device, loads nothing and plays nothing
+class NullAudio:
+    def load(self):
+        pass
+
+    def play(self, name, position=None, priority=0, listener=None):
+        pass
+
+audio = NullAudio()
+
+# Uniform grid of sprites for the collision broadphase, rebuilt every tick
+class SpatialHash:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def rebuild(self, group):
+        self.cells = {}
+        for sprite in group:
+            self.insert(sprite)
+
+    def insert(self, sprite):
+        for cell in self.cells_for(sprite.rect):
+            bucket = self.cells.get(cell)
+            if bucket is None:
+                self.cells[cell] = [sprite]
+            else:
+                bucket.append(sprite)
+
+    def cells_for(self, rect):
+        size = self.cell_size
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield cx, cy
+
+    # Sprites sharing a cell with rect, each returned once in insertion order
+    def query(self, rect):
+        found = {}
+        for cell in self.cells_for(rect):
+            for sprite in self.cells.get(cell, ()):
+                found[sprite] = None
+        return found
+
+collision_grid = SpatialHash(COLLISION_CELL_SIZE)
+
+# Typed pool that resets and reuses dead sprites instead of constructing new ones
+class ObjectPool:
+    def __init__(self, cls, capacity, overflow):
+        self.cls = cls
+        self.capacity = capacity
+        self.overflow = overflow
+        self.free = []
+        self.live = {}  # Insertion ordered, so the first key is the oldest live object
+        self.acquired = 0
+        self.created = 0
+        self.reused = 0
+        self.dropped = 0
+        self.high_water = 0
+
+    def acquire(self, *args):
+        self.acquired += 1
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.reused += 1
+        elif len(self.live) < self.capacity or self.overflow == POOL_GROW:
+            obj = self.cls(*args)
+            obj.pool = self
+            self.created += 1
+        elif self.overflow == POOL_RECYCLE:
+            next(iter(self.live)).kill()  # Returns the oldest object to the free list
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.reused += 1
+        else:
+            self.dropped += 1
+            return None
+        self.live[obj] = None
+        self.high_water = max(self.high_water, len(self.live))
+        return obj
+
+    def release(self, obj):
+        if obj in self.live:  # Ignore repeated kills of the same object
+            del self.live[obj]
+            if len(self.free) < self.capacity:
+                self.free.append(obj)
+
+    # Kill everything still live, used when the sprite groups are thrown away
+    def release_all(self):
+        for obj in list(self.live):
+            obj.kill()
+
+    def stats(self):
+        return {
+            "live": len(self.live),
+            "free": len(self.free),
+            "high_water": self.high_water,
+            "created": self.created,
+            "reused": self.reused,
+            "dropped": self.dropped,
+            "reuse_rate": self.reused / self.acquired if self.acquired else 0,
+        }
+
+# Grid over enemy positions answering nearest-neighbour queries, rebuilt once per tick
+class NearestIndex:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cols = math.ceil(SCREEN_WIDTH / cell_size)
+        self.rows = math.ceil(SCREEN_HEIGHT / cell_size)
+        self.cells = {}
+
+    def cell_of(self, x, y):
+        col = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return col, row
+
+    def rebuild(self, sprites):
+        self.cells = {}
+        for sprite in sprites:
+            cell = self.cell_of(*sprite.rect.center)
+            bucket = self.cells.get(cell)
+            if bucket is None:
+                self.cells[cell] = [sprite]
+            else:
+                bucket.append(sprite)
+
+    # Distance between two points, optionally the shorter way round the screen edges
+    def distance(self, ax, ay, bx, by, wrap):
+        dx = abs(ax - bx)
+        dy = abs(ay - by)
+        if wrap:
+            dx = min(dx, SCREEN_WIDTH - dx)
+            dy = min(dy, SCREEN_HEIGHT - dy)
+        return math.hypot(dx, dy)
+
+    # Cells at Chebyshev distance r from (col, row)
+    def ring(self, col, row, r, wrap):
+        if r == 0:
+            offsets = [(0, 0)]
+        else:
+            offsets = [(i, -r) for i in range(-r, r + 1)] + [(i, r) for i in range(-r, r + 1)]
+            offsets += [(-r, j) for j in range(-r + 1, r)] + [(r, j) for j in range(-r + 1, r)]
+        for i, j in offsets:
+            if wrap:
+                yield (col + i) % self.cols, (row + j) % self.rows
+            elif 0 <= col + i < self.cols and 0 <= row + j < self.rows:
+                yield col + i, row + j
+
+    # Closest sprite to (x, y) and its distance, searching outwards ring by ring
+    def nearest(self, x, y, wrap=True):
+        best = None
+        best_distance = math.inf
+        if not self.cells:
+            return best, best_distance
+        col, row = self.cell_of(x % SCREEN_WIDTH, y % SCREEN_HEIGHT) if wrap else self.cell_of(x, y)
+        max_ring = max(self.cols, self.rows) // 2 + 1 if wrap else max(self.cols, self.rows)
+        seen = set()
+        for r in range(max_ring + 1):
+            for cell in self.ring(col, row, r, wrap):
+                if cell in seen:
+                    continue
+                seen.add(cell)
+                for sprite in self.cells.get(cell, ()):
+                    d = self.distance(x, y, sprite.rect.centerx, sprite.rect.centery, wrap)
+                    if d < best_distance:
+                        best, best_distance = sprite, d
+            # Anything in the next ring is at least r cells away
+            if best is not None and best_distance <= r * self.cell_size:
+                break
+        return best, best_distance
+
+enemy_index = NearestIndex(TARGET_CELL_SIZE)
+
+# Function to keep or replace a player missile's cached target, returns the target and ticks until the next check
+def acquire_target(x, y, target, retarget_in):
+    if target is not None and target.alive() and retarget_in > 0:
+        return target, retarget_in - 1
+
+    # Missiles are removed at the screen edge rather than wrapping, so targets are ranked by direct distance
+    candidate, candidate_distance = enemy_index.nearest(x, y, wrap=False)
+    if target is not None and target.alive() and candidate is not target:
+        current_distance = enemy_index.distance(x, y, target.rect.centerx, target.rect.centery, False)
+        if candidate_distance > current_distance * SMART_MISSILE_RETARGET_RATIO:
+            candidate = target
+    return candidate, SMART_MISSILE_RETARGET_TICKS
+
+# A projectile hit reported by the engine, standing in for the weapon sprite in check_collisions
+class ProjectileHit:
+    def __init__(self, weapon_class, damage):
+        self.weapon_class = weapon_class
+        self.damage = damage
+
+# One side's projectiles in the engine, passed to check_collisions in place of a sprite group
+class ProjectileSide:
+    def __init__(self, engine, side):
+        self.engine = engine
+        self.side = side
+
+    def collide(self, sprite, dokill):
+        return self.engine.collide(sprite, self.side, dokill)
+
+    def __len__(self):
+        return self.engine.side_count(self.side)
+
+# Struct-of-arrays projectile simulation, every live shot advanced in one vectorized step
+class ProjectileEngine:
+    def __init__(self, enabled, capacity):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.count = 0
+        self.kinds = None
+        self.player_side = ProjectileSide(self, PLAYER_SIDE)
+        self.enemy_side = ProjectileSide(self, ENEMY_SIDE)
+        self.cell_keys = None  # Broadphase index, rebuilt on the first collide after projectiles move
+        if enabled:
+            self.allocate(capacity)
+            self.heading_sin = np.array(SIN_TABLE)
+            self.heading_cos = np.array(COS_TABLE)
+
+    def allocate(self, capacity):
+        old = self.__dict__.get("x")
+        arrays = {}
+        for name in ("x", "y", "prev_x", "prev_y", "angle", "vx", "vy", "traveled"):
+            arrays[name] = np.zeros(capacity)
+        for name in ("left", "top", "right", "bottom"):
+            arrays[name] = np.zeros(capacity, dtype=np.int32)
+        arrays["kind"] = np.zeros(capacity, dtype=np.int8)
+        arrays["side"] = np.zeros(capacity, dtype=np.int8)
+        arrays["alive"] = np.zeros(capacity, dtype=bool)
+        arrays["target"] = np.full(capacity, None, dtype=object)  # Cached target of a player smart missile
+        arrays["retarget_in"] = np.zeros(capacity, dtype=np.int32)
+        for name, array in arrays.items():
+            if old is not None:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.columns = list(arrays)
+        self.capacity = capacity
+
+    # Bytes one projectile occupies across the engine's arrays
+    def row_bytes(self):
+        return sum(getattr(self, name).itemsize for name in self.columns)
+
+    # Per-type stats and rotated frames, read from each weapon class once the assets are loaded
+    def load_kinds(self, weapon_classes):
+        self.kinds = weapon_classes
+        self.kind_index = {cls: i for i, cls in enumerate(weapon_classes)}
+        templates = [cls(0, 0, 0, None) for cls in weapon_classes]
+        self.kind_speed = np.array([t.speed for t in templates])
+        self.kind_damage = [t.damage for t in templates]  # Plain ints, so entity health stays a Python number
+        self.kind_range = np.array([t.range for t in templates])
+        self.kind_homing = np.array([isinstance(t, SmartMissile) for t in templates])
+        self.kind_beam = np.array([t.beam for t in templates])
+        self.kind_half_length = np.array([t.original_image.get_height() / 2 for t in templates])
+        self.kind_half_width = np.array([t.original_image.get_width() / 2 for t in templates])
+        self.frames = []
+        for t in templates:
+            self.frames.append([rotation_cache.get(t.image_key, t.original_image, step * 360 / ROTATION_STEPS)
+                                for step in range(ROTATION_STEPS)])
+        self.frame_w = np.array([[f.rect.width for f in frames] for frames in self.frames])
+        self.frame_h = np.array([[f.rect.height for f in frames] for frames in self.frames])
+
+    def clear(self):
+        self.count = 0
+        self.cell_keys = None
+
+    def side_count(self, side):
+        n = self.count
+        return int(np.count_nonzero(self.alive[:n] & (self.side[:n] == side)))
+
+    def spawn(self, weapon_class, x, y, angle, side):
+        if self.count == self.capacity:
+            self.allocate(self.capacity * 2)
+        i = self.count
+        self.count += 1
+        k = self.kind_index[weapon_class]
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.angle[i] = angle
+        sin, cos = heading_vector(angle)
+        self.vx[i] = -self.kind_speed[k] * sin
+        self.vy[i] = -self.kind_speed[k] * cos
+        self.traveled[i] = 0
+        self.kind[i] = k
+        self.side[i] = side
+        self.alive[i] = True
+        self.target[i] = None
+        self.retarget_in[i] = 0
+        self.update_bounds(slice(i, i + 1))
+        self.cell_keys = None
+
+    # Rects of the rotated frames, matching the rect a Weapon sprite would have
+    def update_bounds(self, s):
+        steps = np.rint(self.angle[s] * ROTATION_STEPS / 360).astype(np.int32) % ROTATION_STEPS
+        kind = self.kind[s]
+        w = self.frame_w[kind, steps]
+        h = self.frame_h[kind, steps]
+        self.left[s] = np.floor(self.x[s]) - w // 2
+        self.top[s] = np.floor(self.y[s]) - h // 2
+        self.right[s] = self.left[s] + w
+        self.bottom[s] = self.top[s] + h
+
+    # Drop dead entries so the live projectiles stay contiguous
+    def compact(self):
+        n = self.count
+        keep = np.nonzero(self.alive[:n])[0]
+        m = len(keep)
+        if m == n:
+            return
+        for name in ("x", "y", "prev_x", "prev_y", "angle", "vx", "vy", "traveled",
+                     "left", "top", "right", "bottom", "kind", "side", "alive", "target", "retarget_in"):
+            array = getattr(self, name)
+            array[:m] = array[keep]
+        self.count = m
+
+    def step(self, target):
+        self.compact()
+        n = self.count
+        if not n:
+            return
+        s = slice(0, n)
+        self.prev_x[s] = self.x[s]
+        self.prev_y[s] = self.y[s]
+
+        homing = self.kind_homing[self.kind[s]]
+        if homing.any():
+            self.steer(np.nonzero(homing)[0], target)
+
+        self.x[s] += self.vx[s]
+        self.y[s] += self.vy[s]
+        self.traveled[s] += self.kind_speed[self.kind[s]]
+        self.update_bounds(s)
+
+        # Remove projectiles that leave the screen or exceed their range
+        dead = (self.bottom[s] < 0) | (self.top[s] > SCREEN_HEIGHT) | \
+               (self.left[s] > SCREEN_WIDTH) | (self.right[s] < 0) | \
+               (self.traveled[s] > self.kind_range[self.kind[s]])
+        self.alive[s] &= ~dead
+        self.cell_keys = None
+
+    # Sort the rows by the collision grid cell of their top-left corner, the engine's side of the broadphase
+    def index_cells(self):
+        n = self.count
+        size = COLLISION_CELL_SIZE
+        cx = self.left[:n] // size
+        cy = self.top[:n] // size
+        self.cell_y_min = int(cy.min()) if n else 0
+        self.cell_y_max = int(cy.max()) if n else 0
+        self.cell_stride = self.cell_y_max - self.cell_y_min + 1
+        # How many cells past its corner cell a projectile reaches, so a query widens its range by that much
+        self.cell_reach_x = int(((self.right[:n] - 1) // size - cx).max()) if n else 0
+        self.cell_reach_y = int(((self.bottom[:n] - 1) // size - cy).max()) if n else 0
+        keys = cx.astype(np.int64) * self.cell_stride + (cy - self.cell_y_min)
+        order = np.argsort(keys, kind="stable")
+        # Plain lists, a query touches only a handful of rows and per-call NumPy overhead would dominate
+        self.cell_keys = keys[order].tolist()
+        self.cell_rows = list(zip(order.tolist(), self.side[order].tolist(), self.left[order].tolist(),
+                                  self.top[order].tolist(), self.right[order].tolist(), self.bottom[order].tolist()))
+
+    # Live rows of one side whose bounds overlap rect, in spawn order
+    def query_cells(self, rect, side):
+        if self.cell_keys is None:
+            self.index_cells()
+        size = COLLISION_CELL_SIZE
+        top = max(rect.top // size - self.cell_reach_y, self.cell_y_min) - self.cell_y_min
+        bottom = min((rect.bottom - 1) // size, self.cell_y_max) - self.cell_y_min
+        found = []
+        if top > bottom:
+            return found
+        keys = self.cell_keys
+        rows = self.cell_rows
+        alive = self.alive
+        # Cells of one column are consecutive keys, so each column is one slice of the sorted rows
+        for column in range(rect.left // size - self.cell_reach_x, (rect.right - 1) // size + 1):
+            start = bisect_left(keys, column * self.cell_stride + top)
+            end = bisect_right(keys, column * self.cell_stride + bottom, start)
+            for i, s, left, t, right, b in rows[start:end]:
+                if s == side and left < rect.right and right > rect.left and t < rect.bottom and b > rect.top \
+                        and alive[i]:
+                    found.append(i)
+        found.sort()
+        return found
+
+    # Turn smart missiles towards the player, or the closest enemy for the player's missiles
+    def steer(self, idx, target):
+        tx = np.full(len(idx), np.nan)
+        ty = np.full(len(idx), np.nan)
+        enemy_owned = self.side[idx] == ENEMY_SIDE
+        tx[enemy_owned], ty[enemy_owned] = target.rect.center
+
+        # Player missiles keep a cached target from the nearest-enemy index
+        for j in np.nonzero(~enemy_owned)[0].tolist():
+            i = idx[j]
+            chosen, self.retarget_in[i] = acquire_target(self.x[i], self.y[i], self.target[i], self.retarget_in[i])
+            self.target[i] = chosen
+            if chosen is not None:
+                tx[j], ty[j] = chosen.rect.center
+
+        has_target = ~np.isnan(tx)
+        idx = idx[has_target]
+        dx = tx[has_target] - self.x[idx]
+        dy = ty[has_target] - self.y[idx]
+        angle_to_target = np.degrees(np.arctan2(-dy, dx)) - 90  # Align with Pygame's y-axis direction
+        angle_to_target[angle_to_target < 0] += 360
+        angle_diff = (angle_to_target - self.angle[idx] + 180) % 360 - 180
+        self.angle[idx] += np.clip(angle_diff, -.05, .05)
+
+        speed = self.kind_speed[self.kind[idx]]
+        heading = np.rint(self.angle[idx] * (HEADING_STEPS / 360)).astype(np.int64) % HEADING_STEPS
+        self.vx[idx] = -speed * self.heading_sin[heading]
+        self.vy[idx] = -speed * self.heading_cos[heading]
+
+    # Live projectiles of one side touching a sprite, in spawn order
+    def collide(self, sprite, side, dokill):
+        found = self.query_cells(sprite.rect, side)
+        if not found:
+            return []
+        idx = np.array(found)
+        if MASK_COLLISIONS and len(idx):
+            idx = self.confirm(sprite, idx)
+        if dokill:
+            self.alive[idx] = False
+        return [ProjectileHit(self.kinds[k], self.kind_damage[k]) for k in self.kind[idx].tolist()]
+
+    # Rect hits idx that really touch sprite: beams in one vectorized segment-vs-circle pass, the rest by masks
+    def confirm(self, sprite, idx):
+        narrowphase.candidates += len(idx)
+        beam = self.kind_beam[self.kind[idx]]
+        touching = np.zeros(len(idx), dtype=bool)
+
+        b = idx[beam]
+        if len(b):
+            cx, cy = sprite.rect.center
+            radius = narrowphase.radius(sprite.image_key, sprite.original_image)
+            heading = np.rint(self.angle[b] * (HEADING_STEPS / 360)).astype(np.int64) % HEADING_STEPS
+            sin = self.heading_sin[heading]
+            cos = self.heading_cos[heading]
+            half_length = self.kind_half_length[self.kind[b]]
+            t = np.clip(-(cx - self.x[b]) * sin - (cy - self.y[b]) * cos, -half_length, half_length)
+            dx = cx - (self.x[b] - t * sin)
+            dy = cy - (self.y[b] - t * cos)
+            reach = radius + self.kind_half_width[self.kind[b]]
+            touching[beam] = dx * dx + dy * dy <= reach * reach
+
+        # Missiles against the sprite's frame mask, each shot's mask cached on its rotated frame
+        rest = idx[~beam]
+        if len(rest):
+            frame = getattr(sprite, "frame", None)
+            mask = frame.mask if frame else pygame.mask.from_surface(sprite.image)
+            x, y = sprite.rect.topleft
+            steps = np.rint(self.angle[rest] * ROTATION_STEPS / 360).astype(np.int32) % ROTATION_STEPS
+            frames = self.frames
+            for j, k, step, left, top in zip(np.nonzero(~beam)[0].tolist(), self.kind[rest].tolist(), steps.tolist(),
+                                             self.left[rest].tolist(), self.top[rest].tolist()):
+                offset = (int(left) - x, int(top) - y)
+                touching[j] = mask.overlap(frames[k][step].mask, offset) is not None
+
+        idx = idx[touching]
+        narrowphase.confirmed += len(idx)
+        return idx
+
+    def draw(self, surf, alpha):
+        idx = np.nonzero(self.alive[:self.count])[0]
+        if not len(idx):
+            return
+        steps = np.rint(self.angle[idx] * ROTATION_STEPS / 360).astype(np.int32) % ROTATION_STEPS
+        kind = self.kind[idx]
+        x = np.floor(self.prev_x[idx] + (self.x[idx] - self.prev_x[idx]) * alpha)
+        y = np.floor(self.prev_y[idx] + (self.y[idx] - self.prev_y[idx]) * alpha)
+        left = (x - self.frame_w[kind, steps] // 2).astype(np.int32).tolist()
+        top = (y - self.frame_h[kind, steps] // 2).astype(np.int32).tolist()
+        frames = self.frames
+        images = [frames[k][step].image for k, step in zip(kind.tolist(), steps.tolist())]
+        renderer.add_all(surf.blits(list(zip(images, zip(left, top)))))
+
+projectile_engine = ProjectileEngine(PROJECTILE_ENGINE, PROJECTILE_CAPACITY)
+
+# Function to get the player's live projectiles, from the engine when it is running
+def player_projectiles():
+    return projectile_engine.player_side if projectile_engine.enabled else lasers
+
+# Function to get the enemies' live projectiles, from the engine when it is running
+def enemy_projectiles():
+    return projectile_engine.enemy_side if projectile_engine.enabled else enemy_lasers
+
+# Function to swap a sprite's image for its cached rotated frame, keeping its center
+def rotate_sprite(sprite, angle):
+    center = sprite.rect.center
+    sprite.frame = rotation_cache.get(sprite.image_key, sprite.original_image, angle)
+    sprite.image = sprite.frame.image
+    sprite.rect = sprite.frame.rect.copy()
+    sprite.rect.center = center
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 GREEN = (0, 255, 0)
 BLUE = (0, 255, 255)
 
-# Load title screen background
-title_screen = pygame.image.load("assets/title_screen.png")
-title_screen = pygame.transform.scale(title_screen, (SCREEN_WIDTH, SCREEN_HEIGHT))
+# Function to load the title screen background
+title_screen = None  # Decoded by the startup loader
+
+def load_title_screen():
+    global title_screen
+    start = time.perf_counter()
+    image = pygame.image.load("assets/title_screen.png")
+    title_screen = pygame.transform.scale(image, (SCREEN_WIDTH, SCREEN_HEIGHT))
+    assets.load_times["assets/title_screen.png"] = time.perf_counter() - start
 
 # Create surfaces with per-pixel alpha for health bars
-outline_surf = pygame.Surface((32, 6), pygame.SRCALPHA)
-fill_surf = pygame.Surface((32, 6), pygame.SRCALPHA)
+outline_surf = pygame.Surface((HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT), pygame.SRCALPHA)
 pygame.draw.rect(outline_surf, (255, 255, 255, 128), outline_surf.get_rect(), 1)
-pygame.draw.rect(fill_surf, (0, 255, 0, 96), fill_surf.get_rect())
+
+# Fill surfaces pre-rendered at every quantized health level
+health_fill_surfs = []
+for level in range(HEALTH_BAR_LEVELS + 1):
+    fill_surf = pygame.Surface((HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT), pygame.SRCALPHA)
+    pygame.draw.rect(fill_surf, (0, 255, 0, 96), (0, 0, level * HEALTH_BAR_WIDTH // HEALTH_BAR_LEVELS, HEALTH_BAR_HEIGHT))
+    health_fill_surfs.append(fill_surf)
 
 # Function to handle title screen display and input
 def title_screen_func(screen):
     global current_state
+    renderer.invalidate()
     screen.fill(BLACK)
-    screen.blit(title_screen, (0, 0))
+    if title_screen is not None:
+        screen.blit(title_screen, (0, 0))
+        startup.mark("title_shown")
+    if not startup.ready:
+        text = text_cache.render(f"Loading... {startup.done}/{startup.total}", 48, WHITE)
+        screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT - 80))
     for event in pygame.event.get():
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE:
-                reset_game()
-                current_state = STATE_PLAYING
+                startup.start_requested = True
         if event.type == pygame.QUIT:
             pygame.quit()
             sys.exit()
 
+    # Readiness barrier: a game only starts once the worker has finished loading
+    if startup.start_requested and startup.finished.is_set():
+        startup.start_requested = False
+        startup.finish()
+        reset_game()
+        current_state = STATE_PLAYING
+
 # Function to reset all game states
 def reset_game():
-    global player, enemies, all_sprites, lasers, enemy_lasers, power_ups
+    global player, enemies, all_sprites, lasers, enemy_lasers, power_ups, score, kills
+
+    all_sprites = SlotGroup()
+    enemies = SlotGroup()
+    lasers = SlotGroup()
+    enemy_lasers = SlotGroup()
+    power_ups = SlotGroup()
+
+    # Reclaim projectiles and explosions left over from the last game
+    for pool in pools.values():
+        pool.release_all()
+    if projectile_engine.enabled:
+        if projectile_engine.kinds is None:
+            projectile_engine.load_kinds([GreenLaser, BlueLaser, DumbMissile, SmartMissile])
+        projectile_engine.clear()
 
-    all_sprites = pygame.sprite.Group()
-    enemies = pygame.sprite.Group()
-    lasers = pygame.sprite.Group()
-    enemy_lasers = pygame.sprite.Group()
-    power_ups = pygame.sprite.Group()
+    score = 0
+    kills = 0
+
+    # Restart the simulation clock and the wave sequence
+    sim_clock.reset()
+    spawner.reset()
 
     # Create player
     player = Player()
     all_sprites.add(player)
+    collision_grid.rebuild(all_sprites)  # Spawn placement checks the grid for free cells
 
     # Create enemies
     create_enemies()
 
+# Function to record a newly spawned sprite in the event log
+def log_spawn(sprite):
+    event_log.emit("spawn", EVENT_DEBUG, sprite=type(sprite).__name__, x=sprite.rect.centerx, y=sprite.rect.centery)
+
+# Function to spawn the next wave all at once, used when a game starts
 def create_enemies():
-    for _ in range(3):
-        while True:
-            enemy1 = Enemy("assets/enemy1.png", 100, .2)
-            # Generate random position within annulus
-            radius = random.randint(ENEMY_SPAWN_DISTANCE, SCREEN_WIDTH // 2)
-            angle = random.uniform(0, 2 * math.pi)
-            x = player.rect.centerx + radius * math.cos(angle)
-            y = player.rect.centery + radius * math.sin(angle)
-            enemy1.rect.center = (x, y)
-            if not pygame.sprite.spritecollideany(enemy1, all_sprites):
-                break  # No collision, position is valid
-        all_sprites.add(enemy1)
-        enemies.add(enemy1)
-
-        while True:        
-            # Generate random position within annulus
-            radius = random.randint(ENEMY_SPAWN_DISTANCE, SCREEN_WIDTH // 2)
-            angle = random.uniform(0, 2 * math.pi)
-            x = player.rect.centerx + radius * math.cos(angle)
-            y = player.rect.centery + radius * math.sin(angle)
-            enemy2 = Enemy("assets/enemy2.png", 160, .03, GreenLaser(x, y, angle))
-            enemy2.rect.center = (x, y)
-            if not pygame.sprite.spritecollideany(enemy2, all_sprites):
-                break  # No collision, position is valid
-        all_sprites.add(enemy2)
-        enemies.add(enemy2)
-        
-        while True:
-            # Generate random position within annulus
-            radius = random.randint(ENEMY_SPAWN_DISTANCE, SCREEN_WIDTH // 2)
-            angle = random.uniform(0, 2 * math.pi)
-            x = player.rect.centerx + radius * math.cos(angle)
-            y = player.rect.centery + radius * math.sin(angle)
-            enemy3 = Enemy("assets/enemy3.png", 240, .04, BlueLaser(x, y, angle)) 
-            enemy3.rect.center = (x, y)
-            if not pygame.sprite.spritecollideany(enemy3, all_sprites):
-                break
-        all_sprites.add(enemy3)
-        enemies.add(enemy3)
-        
-        while True:
-            # Generate random position within annulus, similar to other enemies
-            radius = random.randint(ENEMY_SPAWN_DISTANCE, SCREEN_WIDTH // 2)
-            angle = random.uniform(0, 2 * math.pi)
-            x = player.rect.centerx + radius * math.cos(angle)
-            y = player.rect.centery + radius * math.sin(angle)
-            enemy4 = Enemy("assets/enemy4.png", 120, .05, DumbMissile(x, y, angle))
-            enemy4.rect.center = (x, y)
-            if not pygame.sprite.spritecollideany(enemy4, all_sprites):
-                break  # No collision, position is valid
-        all_sprites.add(enemy4)
-        enemies.add(enemy4)
-        while True:
-            # Generate random position within annulus, similar to other enemies
-            radius = random.randint(ENEMY_SPAWN_DISTANCE, SCREEN_WIDTH // 2)
-            angle = random.uniform(0, 2 * math.pi)
-            x = player.rect.centerx + radius * math.cos(angle)
-            y = player.rect.centery + radius * math.sin(angle)
-            enemy5 = Enemy("assets/enemy5.png", 120, .06, SmartMissile(x, y, angle, Enemy))
-            enemy5.rect.center = (x, y)
-            if not pygame.sprite.spritecollideany(enemy5, all_sprites):
-                break  # No collision, position is valid
-        all_sprites.add(enemy5)
-        enemies.add(enemy5)
+    spawner.start_wave()
+    spawner.place()
 
 # Function to handle the gameplay
-def play_game(screen):
-    global current_state
-    
+def play_game(screen, frame_time):
     # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+    with profiler.phase("events"):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN and event.key == PROFILER_TOGGLE_KEY:
+                profiler.visible = not profiler.visible
+            if event.type == pygame.KEYDOWN and event.key == HUD_TOGGLE_KEY:
+                hud.visible = not hud.visible
+
+    # Run as many fixed ticks as the elapsed frame time covers
+    sim_clock.accumulator += min(frame_time, MAX_FRAME_TIME)
+    while sim_clock.accumulator >= sim_clock.dt and current_state == STATE_PLAYING:
+        game_tick()
+        sim_clock.accumulator -= sim_clock.dt
+
+    # Draw between the last two ticks
+    draw_game(screen, sim_clock.accumulator / sim_clock.dt)
+    hud.frame(frame_time)
+    if hud.visible:
+        renderer.add_all(hud.draw(screen, {
+            "Score": score,
+            "Kills": kills,
+            "Wave": spawner.wave,
+            "FPS": hud.fps(),
+            "Enemies": len(enemies),
+            "Projectiles": len(player_projectiles()) + len(enemy_projectiles()),
+        }))
+    if profiler.visible:
+        renderer.add(profiler.draw(screen, {**sprite_counts(), **runtime_stats()}))
+
+# Function to count the sprites in each group, shown by the profiler overlay
+def sprite_counts():
+    return {
+        "all_sprites": len(all_sprites),
+        "enemies": len(enemies),
+        "lasers": len(player_projectiles()),
+        "enemy_lasers": len(enemy_projectiles()),
+        "power_ups": len(power_ups),
+    }
+
+# Function to summarise the counters kept by the pools, caches, narrowphase, renderer and event log
+def runtime_stats():
+    stats = {}
+    for cls, pool in pools.items():
+        s = pool.stats()
+        stats[f"pool {cls.__name__}"] = (f"{s['created']} created, {s['reused']} reused ({s['reuse_rate']:.0%}), "
+                                         f"{s['dropped']} dropped, high water {s['high_water']}")
+    stats["rotation cache"] = f"{rotation_cache.hits} hits, {rotation_cache.misses} misses"
+    stats["text cache"] = f"{text_cache.hits} hits, {text_cache.misses} misses"
+    stats["narrowphase"] = f"{narrowphase.confirmed} of {narrowphase.candidates} rect hits confirmed"
+    stats["presents"] = f"{renderer.full_presents} full, {renderer.dirty_presents} dirty"
+    if event_log.enabled:
+        stats["events dropped"] = event_log.dropped
+    return stats
+
+# Function to advance the simulation by one fixed tick
+def game_tick():
+    global current_state
+
+    sim_clock.advance()
+
+    # Remember where each sprite was so rendering can interpolate
+    for sprite in all_sprites:
+        sprite.prev_center = sprite.rect.center
 
     # Update sprites
-    if player.alive():  # Only update enemies if the player is alive
-        all_sprites.update()
-    else:
-        player.kill()  # Remove the player from all groups
-        for enemy in enemies:
-            enemy.speed = 0  # Set enemy speed to 0
-            enemy.shoot_delay = None  # Disable shooting
+    with profiler.phase("update"):
+        if player.alive():  # Only update enemies if the player is alive
+            update_world()
+        else:
+            player.kill()  # Remove the player from all groups
+            for enemy in enemies:
+                enemy.speed = 0  # Set enemy speed to 0
+                enemy.shoot_delay = None  # Disable shooting
 
     # Check collisions
-    check_collisions(player, enemies)
-    check_collisions(player, enemy_lasers)
-    check_collisions(enemies, lasers) 
-    check_collisions(player, power_ups)
+    with profiler.phase("broadphase"):
+        collision_grid.rebuild(all_sprites)
+    with profiler.phase("collide_player_enemies"):
+        check_collisions(player, enemies, grid=collision_grid)
+    with profiler.phase("collide_player_enemy_lasers"):
+        check_collisions(player, enemy_projectiles(), grid=collision_grid)
+    with profiler.phase("collide_enemies_lasers"):
+        check_collisions(enemies, player_projectiles(), grid=collision_grid)
+    with profiler.phase("collide_player_power_ups"):
+        check_collisions(player, power_ups, grid=collision_grid)
 
+    if not player.alive():
+        current_state = STATE_GAME_OVER
+
+    if input_tape is not None:
+        input_tape.end_tick()
+
+# Function to fingerprint the simulation state, replays compare it against the recording
+def state_checksum():
+    crc = zlib.crc32(struct.pack("<IIII", sim_clock.ticks, len(all_sprites), len(enemies), len(power_ups)))
+    for sprite in all_sprites:
+        crc = zlib.crc32(struct.pack("<iidd", sprite.rect.x, sprite.rect.y,
+                                     getattr(sprite, "angle", 0), getattr(sprite, "health", 0)), crc)
+    if projectile_engine.enabled:
+        n = projectile_engine.count
+        for name in ("x", "y", "angle", "kind", "side", "alive"):
+            crc = zlib.crc32(getattr(projectile_engine, name)[:n].tobytes(), crc)
+    state = rng.getstate()[1]
+    return zlib.crc32(struct.pack(f"<{len(state)}I", *state), crc)
+
+# Function to steer every enemy towards the target in one batch: shortest wrap-around direction, heading and aim
+def steer_enemies(ships, target):
+    if not ships:
+        return
+    tx, ty = target.rect.center
+    if np is None:
+        for ship in ships:
+            dx = (tx - ship.rect.centerx + SCREEN_WIDTH / 2) % SCREEN_WIDTH - SCREEN_WIDTH / 2
+            dy = (ty - ship.rect.centery + SCREEN_HEIGHT / 2) % SCREEN_HEIGHT - SCREEN_HEIGHT / 2
+            dist = math.hypot(dx, dy) or 1
+            ship.steer_x = dx / dist
+            ship.steer_y = dy / dist
+            ship.heading = math.degrees(math.atan2(-ship.steer_x, -ship.steer_y))
+            ship.aim_angle = math.degrees(math.atan2(ship.rect.centerx - tx, ship.rect.centery - ty))
+        return
+
+    centers = np.array([ship.rect.center for ship in ships], dtype=float)
+    direct_x = tx - centers[:, 0]
+    direct_y = ty - centers[:, 1]
+
+    # Toroidal shortest-path delta to the target
+    dx = (direct_x + SCREEN_WIDTH / 2) % SCREEN_WIDTH - SCREEN_WIDTH / 2
+    dy = (direct_y + SCREEN_HEIGHT / 2) % SCREEN_HEIGHT - SCREEN_HEIGHT / 2
+    dist = np.hypot(dx, dy)
+    dist[dist == 0] = 1
+    dx /= dist
+    dy /= dist
+    heading = np.degrees(np.arctan2(-dx, -dy))
+
+    # Weapons aim straight at the target, not across the screen edge
+    aim = np.degrees(np.arctan2(-direct_x, -direct_y))
+
+    for ship, sx, sy, h, a in zip(ships, dx.tolist(), dy.tolist(), heading.tolist(), aim.tolist()):
+        ship.steer_x = sx
+        ship.steer_y = sy
+        ship.heading = h
+        ship.aim_angle = a
+
+# Function to move every sprite and projectile by one tick
+def update_world():
+    # Projectiles fired during this tick's sprite updates first move on the next tick, as sprites added mid-update do
+    ships = enemies.sprites()
+    enemy_index.rebuild(ships)
+    if projectile_engine.enabled:
+        projectile_engine.step(player)
+    steer_enemies(ships, player)
+    all_sprites.update()
+    spawner.update(len(enemies))  # New arrivals start moving next tick
+
+# Function to draw every sprite and projectile
+def draw_world(screen, alpha):
+    draw_interpolated(screen, all_sprites, alpha)
+    if projectile_engine.enabled:
+        projectile_engine.draw(screen, alpha)
+
+# Function to draw the playfield, alpha is the fraction of a tick since the last update
+def draw_game(screen, alpha):
     # Draw everything
-    screen.fill(BLACK)
-    all_sprites.draw(screen)
+    with profiler.phase("draw"):
+        renderer.clear(screen)
+        draw_world(screen, alpha)
 
     # Draw health bars
-    if player.alive():  # Check if the player is alive
-        health_bar_rect = pygame.Rect(0, 0, 32, 6)
-        health_bar_rect.center = player.rect.center
-        health_bar_rect.y += HEALTH_BAR_Y_OFFSET
-        health_bar_rect.x += HEALTH_BAR_X_OFFSET
-        draw_health_bar(screen, health_bar_rect, player.health, 100)
-        
-    for enemy in enemies:
-        health_bar_rect = pygame.Rect(0, 0, 32, 6)
-        health_bar_rect.center = enemy.rect.center
-        health_bar_rect.y += HEALTH_BAR_Y_OFFSET
-        health_bar_rect.x += HEALTH_BAR_X_OFFSET
-        draw_health_bar(screen, health_bar_rect, enemy.health, enemy.max_health) 
-
-    if not player.alive():
-        current_state = STATE_GAME_OVER
+    with profiler.phase("health_bars"):
+        if player.alive():  # Check if the player is alive
+            draw_health_bars(screen, [player] + enemies.sprites())
+        else:
+            draw_health_bars(screen, enemies.sprites())
+
+# Function to draw sprites blended between their previous and current tick positions
+def draw_interpolated(surf, group, alpha):
+    for sprite in group:
+        x, y = sprite.rect.center
+        prev_x, prev_y = getattr(sprite, "prev_center", (x, y))
+        dx = x - prev_x
+        dy = y - prev_y
+        # Skip blending across a screen wrap so sprites don't streak over the field
+        if abs(dx) < SCREEN_WIDTH // 2 and abs(dy) < SCREEN_HEIGHT // 2:
+            x = prev_x + dx * alpha
+            y = prev_y + dy * alpha
+        renderer.add(surf.blit(sprite.image, sprite.image.get_rect(center=(round(x), round(y)))))
 
 # Function to display game over screen
 def game_over_screen(screen):
     global current_state
+    renderer.invalidate()
     screen.fill(BLACK)
-    font = pygame.font.Font(None, 74)
-    text = font.render('Press Space to Continue', True, WHITE)
+    text = text_cache.render('Press Space to Continue', 74, WHITE)
     screen.blit(text, (SCREEN_WIDTH // 2 - text.get_rect().width // 2, SCREEN_HEIGHT // 2))
     for event in pygame.event.get():
         if event.type == pygame.KEYDOWN:
@@ -212,89 +1649,131 @@ def apply_movement(entity):
     entity.rect.y += int(entity.move_y)
     entity.move_y -= int(entity.move_y)
 
-# Function to draw health bar
-def draw_health_bar(surf, rect, health, max_health):
-    if health < 0:
-        health = 0
-    bar_length = rect.width
-    bar_height = 6
-    fill_percent = health / max_health
-    fill = fill_percent * bar_length
-
-    # Update fill_surf based on current health
-    fill_surf.fill((0, 0, 0, 0))  # Clear the surface
-    pygame.draw.rect(fill_surf, (0, 255, 0, 96), (0, 0, fill, bar_height))
-
-    # Draw outline
-    outline_rect = rect
-    pygame.draw.rect(outline_surf, (255, 255, 255, 128), outline_rect, 1)
-
-    # Blit the surfaces onto the main surface
-    surf.blit(fill_surf, rect.center)
-    surf.blit(outline_surf, rect.center)
+# Function to pick the pre-rendered fill for a health value
+def health_fill_surf(health, max_health):
+    fill_percent = max(0, min(health, max_health)) / max_health
+    return health_fill_surfs[int(fill_percent * HEALTH_BAR_LEVELS)]
+
+# Function to draw the health bars of many entities with a single blits call
+def draw_health_bars(surf, sprites):
+    blit_sequence = []
+    for sprite in sprites:
+        # Only look the fill up again when the entity's health has changed
+        if getattr(sprite, "bar_health", None) != sprite.health:
+            sprite.bar_health = sprite.health
+            sprite.bar_fill = health_fill_surf(sprite.health, sprite.max_health)
+        position = (sprite.rect.centerx + HEALTH_BAR_X_OFFSET, sprite.rect.centery + HEALTH_BAR_Y_OFFSET)
+        blit_sequence.append((sprite.bar_fill, position))
+        blit_sequence.append((outline_surf, position))
+    renderer.add_all(surf.blits(blit_sequence))
+
+# Function to test two sprites' cached frame masks against each other
+def collide_frames(left, right):
+    left_frame = getattr(left, "frame", None)
+    right_frame = getattr(right, "frame", None)
+    left_mask = left_frame.mask if left_frame else pygame.mask.from_surface(left.image)
+    right_mask = right_frame.mask if right_frame else pygame.mask.from_surface(right.image)
+    offset = (right.rect.x - left.rect.x, right.rect.y - left.rect.y)
+    return left_mask.overlap(right_mask, offset) is not None
+
+# Function to collide a sprite with a group through the spatial hash, same contract as spritecollide
+def grid_spritecollide(sprite, group, grid, dokill):
+    # Candidates killed earlier this tick are no longer in the group
+    rect = sprite.rect
+    hits = [other for other in grid.query(rect) if group.has_internal(other) and rect.colliderect(other.rect)]
+    if MASK_COLLISIONS and hits:
+        hits = narrowphase.confirm(sprite, hits)
+    if dokill:
+        for other in hits:
+            other.kill()
+    return hits
+
+# Function to collide a sprite with a group, using the broadphase grid when one is given
+def find_hits(sprite, group, dokill, grid):
+    if isinstance(group, ProjectileSide):
+        return group.collide(sprite, dokill)
+    if grid is not None:
+        return grid_spritecollide(sprite, group, grid, dokill)
+    if MASK_COLLISIONS:
+        # spritecollide hands every member to the callback, so the rect test goes first
+        collided = lambda a, b: a.rect.colliderect(b.rect) and narrowphase.touches(a, b)
+    else:
+        collided = None
+    return pygame.sprite.spritecollide(sprite, group, dokill, collided)
+
+# Function to give the point sounds are heard from, the player's ship while it is alive
+def listener_position():
+    return player.rect.center if player.alive() else None
+
+# Function to play the impact sound for a projectile type
+def play_hit_sound(weapon_class, position):
+    if issubclass(weapon_class, GreenLaser):
+        audio.play("hit_green", position, listener=listener_position())
+    elif issubclass(weapon_class, BlueLaser):
+        audio.play("hit_blue", position, listener=listener_position())
+    elif issubclass(weapon_class, (DumbMissile, SmartMissile)):
+        audio.play("hit_missile", position, listener=listener_position())
 
 # Function to handle collisions between a sprite and a group
-def check_collisions(sprite, group, dokill=True):
+def check_collisions(sprite, group, dokill=True, grid=None):
     if isinstance(sprite, pygame.sprite.Group):
         for s in sprite.sprites():
-            hits = pygame.sprite.spritecollide(s, group, dokill)
+            hits = find_hits(s, group, dokill, grid)
             for hit in hits:
                 if isinstance(hit, Enemy):
-                    print("A: Player crashes into enemy")
+                    if event_log.enabled:
+                        event_log.emit("crash", EVENT_INFO, target=type(s).__name__)
                     s.health -= 100  # Assuming this is damage from enemy collision
                     if hit.health <= 0:
                         hit.enemy_death()  # Call enemy_death if the enemy is defeated
                 else:
-                    print("A: Player weapon hits enemy")
+                    if event_log.enabled:
+                        event_log.emit("hit", EVENT_DEBUG, weapon=hit.weapon_class.__name__,
+                                       target=type(s).__name__, damage=hit.damage)
                     s.health -= hit.damage  # Assuming damage attribute for other sprites
                     if s.health <= 0:
-                        print("A: Entity killed")
+                        if event_log.enabled:
+                            event_log.emit("kill", EVENT_INFO, target=type(s).__name__,
+                                           weapon=hit.weapon_class.__name__, x=s.rect.centerx, y=s.rect.centery)
                         s.enemy_death()
                         s.kill()
                     # Play appropriate sound effects based on the projectile type
-                    if isinstance(hit, GreenLaser):
-                        hit_sound1.play()
-                    elif isinstance(hit, BlueLaser):
-                        hit_sound2.play()
-                    elif isinstance(hit, DumbMissile):
-                        hit_sound3.play()  
-                    elif isinstance(hit, SmartMissile):
-                        hit_sound3.play()              
+                    play_hit_sound(hit.weapon_class, s.rect.center)
     else:           
-        hits = pygame.sprite.spritecollide(sprite, group, dokill)
+        hits = find_hits(sprite, group, dokill, grid)
         for hit in hits:
-            print(f"B: Collision with {type(hit).__name__}")
             if isinstance(hit, Enemy):
-                print("B: Player crashes into enemy")
+                if event_log.enabled:
+                    event_log.emit("crash", EVENT_INFO, target=type(sprite).__name__)
                 sprite.health -= 100
-                collision_sound.play()
+                audio.play("collision")
                 if hit.health <= 0:
                     hit.enemy_death()  # Enemy handles its own death
             elif isinstance(hit, HPPowerUp): 
-                print("B: Player hits HPPowerUp")
+                if event_log.enabled:
+                    event_log.emit("pickup", EVENT_INFO, power_up="HPPowerUp")
                 sprite.health += 20
                 if sprite.health > sprite.max_health:
                     sprite.health = sprite.max_health
-                hp_sound.play() 
+                audio.play("hp")
             elif isinstance(hit, WeaponPowerUp):
-                print("B: Player picks up WeaponPowerUp")
+                if event_log.enabled:
+                    event_log.emit("pickup", EVENT_INFO, power_up="WeaponPowerUp",
+                                   weapon=type(hit.weapon_type).__name__)
                 sprite.weapon = hit.weapon_type  
                 sprite.weapon.shoot_delay *= .05  # Set player's firing delay to 5% of enemies default
                 hit.kill()  # Remove the power-up
             else:
-                print("B: Enemy weapon hits player")
+                if event_log.enabled:
+                    event_log.emit("hit", EVENT_DEBUG, weapon=hit.weapon_class.__name__,
+                                   target=type(sprite).__name__, damage=hit.damage)
                 sprite.health -= hit.damage
-                if isinstance(hit, GreenLaser):
-                    hit_sound1.play()
-                elif isinstance(hit, BlueLaser):
-                    hit_sound2.play()
-                elif isinstance(hit, DumbMissile):
-                    hit_sound3.play()
-                elif isinstance(hit, SmartMissile):
-                    hit_sound3.play()
+                play_hit_sound(hit.weapon_class, sprite.rect.center)
 
             if sprite.health <= 0:
-                print ("B: Entity killed")
+                if event_log.enabled:
+                    event_log.emit("kill", EVENT_INFO, target=type(sprite).__name__,
+                                   x=sprite.rect.centerx, y=sprite.rect.centery)
                 sprite.kill()
 
 # Function to check if a point is within a certain distance of the player
@@ -302,26 +1781,110 @@ def is_near_player(x, y, distance):
     player_x, player_y = player.sprites()[0].rect.center  # Access the first sprite in the group
     return math.hypot(x - player_x, y - player_y) < distance
 
-class Explosion(pygame.sprite.Sprite):
+# Sprite without a per-instance __dict__, pygame.sprite.Sprite has one so this implements its protocol instead
+class SlotSprite:
+    __slots__ = ("_groups", "image", "rect", "prev_center")
+
+    def __init__(self, *groups):
+        self._groups = []  # A sprite is rarely in more than two groups, a list is smaller than a set
+        if groups:
+            self.add(*groups)
+
+    def add(self, *groups):
+        for group in groups:
+            group.add(self)
+
+    def remove(self, *groups):
+        for group in groups:
+            group.remove(self)
+
+    # Called by the groups themselves
+    def add_internal(self, group):
+        if group not in self._groups:
+            self._groups.append(group)
+
+    def remove_internal(self, group):
+        self._groups.remove(group)
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def kill(self):
+        for group in self._groups:
+            group.remove_internal(self)
+        self._groups.clear()
+
+    def groups(self):
+        return list(self._groups)
+
+    def alive(self):
+        return bool(self._groups)
+
+# Group that adds and removes SlotSprites directly, pygame only reaches them through an exception-driven fallback
+class SlotGroup(pygame.sprite.Group):
+    def add(self, *sprites):
+        for sprite in sprites:
+            if isinstance(sprite, SlotSprite):
+                if not self.has_internal(sprite):
+                    self.add_internal(sprite)
+                    sprite.add_internal(self)
+            else:
+                super().add(sprite)
+
+    def remove(self, *sprites):
+        for sprite in sprites:
+            if isinstance(sprite, SlotSprite):
+                if self.has_internal(sprite):
+                    self.remove_internal(sprite)
+                    sprite.remove_internal(self)
+            else:
+                super().remove(sprite)
+
+class Explosion(SlotSprite):
+    __slots__ = ("pool", "spawn_time")
+
     def __init__(self, center):
         super().__init__()
-        self.image = pygame.image.load("assets/explosion.png").convert_alpha()
+        self.pool = None  # Set when the instance is owned by an ObjectPool
+        self.image = assets.image("assets/explosion.png")
         self.rect = self.image.get_rect(center=center)
-        self.spawn_time = time.time()
+        self.spawn_time = sim_clock.now()
+
+    # Reinitialise a pooled explosion
+    def reset(self, center):
+        self.rect.center = center
+        self.prev_center = center
+        self.spawn_time = sim_clock.now()
 
     def update(self):
-        if time.time() - self.spawn_time > 0.5:  # Explosion lasts for 0.5 seconds
+        if sim_clock.now() - self.spawn_time > 0.5:  # Explosion lasts for 0.5 seconds
             self.kill()
 
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
+
 # Base class for weapons
-class Weapon(pygame.sprite.Sprite):
-    def __init__(self, x, y, angle, image, speed, damage, range, shoot_delay):
+class Weapon(SlotSprite):
+    __slots__ = ("pool", "frame", "angle", "speed", "move_x", "move_y", "damage", "range",
+                 "traveled_distance", "shoot_delay", "velocity_x", "velocity_y")
+    original_image = None  # Shared by every shot of a type, set by its first instance
+    image_key = None  # Rotation cache key shared by every shot of this type
+    beam = False  # Thin straight shots are tested as a segment instead of a mask
+
+    def __init__(self, x, y, angle, image, image_key, speed, damage, range, shoot_delay):
         super().__init__()
-        self.original_image = image
-        self.image = self.original_image.copy()
+        cls = type(self)
+        if cls.original_image is not image:
+            cls.original_image = image
+            cls.image_key = image_key
+        self.pool = None  # Set when the instance is owned by an ObjectPool
+        self.image = image
         self.rect = self.image.get_rect(center=(x, y))
-        self.angle = angle
         self.speed = speed
+        self.aim(angle)
+        rotate_sprite(self, angle)  # Collision checks can run before the first update
         self.move_x = 0
         self.move_y = 0
         self.damage = damage
@@ -329,14 +1892,41 @@ class Weapon(pygame.sprite.Sprite):
         self.traveled_distance = 0  # Track distance traveled
         self.shoot_delay = shoot_delay
 
+    # Reinitialise a pooled projectile for a new shot, type-level stats are left as they are
+    def reset(self, x, y, angle, owner_type=None):
+        self.image = self.original_image
+        self.rect = self.image.get_rect(center=(x, y))
+        self.prev_center = (x, y)
+        self.aim(angle)
+        rotate_sprite(self, angle)  # Replaces the frame, mask and rect left from the previous shot
+        self.move_x = 0
+        self.move_y = 0
+        self.traveled_distance = 0
+
+    # Set the heading and the per-tick velocity that goes with it, only called when the angle changes
+    def aim(self, angle):
+        self.angle = angle
+        sin, cos = heading_vector(angle)
+        self.velocity_x = -self.speed * sin
+        self.velocity_y = -self.speed * cos
+
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
+
+    # Weapon type behind a hit, shared with the projectile engine's ProjectileHit
+    @property
+    def weapon_class(self):
+        return type(self)
+
     def update(self):
         # Rotate weapon image based on current angle
-        self.image = pygame.transform.rotozoom(self.original_image, self.angle, 1) 
-        self.rect = self.image.get_rect(center=self.rect.center) 
+        rotate_sprite(self, self.angle)
     
-        # Calculate movement
-        self.move_x -= self.speed * math.sin(math.radians(self.angle))
-        self.move_y -= self.speed * math.cos(math.radians(self.angle))
+        # Move along the velocity cached when the weapon was aimed
+        self.move_x += self.velocity_x
+        self.move_y += self.velocity_y
         apply_movement(self)
 
          # Update traveled distance
@@ -350,40 +1940,56 @@ class Weapon(pygame.sprite.Sprite):
 
 # Green laser weapon
 class GreenLaser(Weapon):
+    __slots__ = ()
+    beam = True
+
     def __init__(self, x, y, angle, owner_type=None):
-        image = pygame.Surface((1, 30))
-        image.fill(GREEN)
-        super().__init__(x, y, angle, image, 1, 20, math.inf, 4)
+        image = assets.solid((1, 30), GREEN)
+        super().__init__(x, y, angle, image, "green_laser", *WEAPON_STATS["GreenLaser"])
 
     def copy(self):
         return GreenLaser(self.rect.centerx, self.rect.centery, self.angle)
         
 # Blue laser weapon
 class BlueLaser(Weapon):
+    __slots__ = ()
+    beam = True
+
     def __init__(self, x, y, angle, owner_type=None):
-        image = pygame.Surface((1, 30))
-        image.fill(BLUE)
-        super().__init__(x, y, angle, image, .5, 40, math.inf, 8)
+        image = assets.solid((1, 30), BLUE)
+        super().__init__(x, y, angle, image, "blue_laser", *WEAPON_STATS["BlueLaser"])
 
     def copy(self):
         return BlueLaser(self.rect.centerx, self.rect.centery, self.angle)
         
 class DumbMissile(Weapon):
+    __slots__ = ()
+
     def __init__(self, x, y, angle, owner_type=None):
-        image = pygame.image.load("assets/missile1.png").convert_alpha()
-        super().__init__(x, y, angle, image, 0.8, 50, 500, 6)
+        image = assets.image("assets/missile1.png")
+        super().__init__(x, y, angle, image, "assets/missile1.png", *WEAPON_STATS["DumbMissile"])
 
     def copy(self):
         return DumbMissile(self.rect.centerx, self.rect.centery, self.angle)
 
 class SmartMissile(Weapon):
+    __slots__ = ("owner_type", "target", "retarget_in")
+
     def __init__(self, x, y, angle, owner_type):
-        image = pygame.image.load("assets/missile2.png").convert_alpha()
+        image = assets.image("assets/missile2.png")
         self.owner_type = owner_type
-        super().__init__(x, y, angle, image, 0.3, 50, 800, 10)
+        self.target = None  # Cached target of a player missile
+        self.retarget_in = 0
+        super().__init__(x, y, angle, image, "assets/missile2.png", *WEAPON_STATS["SmartMissile"])
 
     def copy(self):
         return SmartMissile(self.rect.centerx, self.rect.centery, self.angle, self.owner_type)
+
+    def reset(self, x, y, angle, owner_type=None):
+        super().reset(x, y, angle)
+        self.owner_type = owner_type
+        self.target = None
+        self.retarget_in = 0
     
     def update(self):
         if issubclass(self.owner_type, Enemy):
@@ -399,16 +2005,13 @@ class SmartMissile(Weapon):
             # Gradually turn the missile towards the player
             angle_diff = (angle_to_target - self.angle + 180) % 360 - 180
             angle_change = max(-.05, min(.05, angle_diff))  # Adjust turning speed if necessary
-            self.angle += angle_change
+            if angle_change:
+                self.aim(self.angle + angle_change)
         elif issubclass(self.owner_type, Player):
-            # Find the closest enemy
-            closest_enemy = None
-            min_distance = float('inf')
-            for enemy in enemies:
-                distance = math.hypot(enemy.rect.centerx - self.rect.centerx, enemy.rect.centery - self.rect.centery)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_enemy = enemy
+            # Find the closest enemy, reusing the cached target between checks
+            self.target, self.retarget_in = acquire_target(
+                self.rect.centerx, self.rect.centery, self.target, self.retarget_in)
+            closest_enemy = self.target
 
             if closest_enemy:
                 # Calculate the angle to the closest enemy
@@ -421,38 +2024,47 @@ class SmartMissile(Weapon):
                 # Gradually turn the missile towards the closest enemy
                 angle_diff = (angle_to_target - self.angle + 180) % 360 - 180
                 angle_change = max(-.05, min(.05, angle_diff))  # Adjust turning speed if necessary
-                self.angle += angle_change
+                if angle_change:
+                    self.aim(self.angle + angle_change)
 
         super().update()
 
-class HPPowerUp(pygame.sprite.Sprite):
+class HPPowerUp(SlotSprite):
+    __slots__ = ()
+
     def __init__(self, x, y):
         super().__init__()
-        self.image = pygame.image.load("assets/hp1.png")
+        self.image = assets.image("assets/hp1.png")
         self.rect = self.image.get_rect()
         self.rect.center = (x, y)
 
-class WeaponPowerUp(pygame.sprite.Sprite):
+class WeaponPowerUp(SlotSprite):
+    __slots__ = ("weapon_type",)
+
     def __init__(self, x, y, weapon_type):
         super().__init__()
         if isinstance(weapon_type, GreenLaser):
-            self.image = pygame.image.load("assets/pu_greenlaser.png")  
+            self.image = assets.image("assets/pu_greenlaser.png")  
         elif isinstance(weapon_type, BlueLaser):
-            self.image = pygame.image.load("assets/pu_bluelaser.png")
+            self.image = assets.image("assets/pu_bluelaser.png")
         elif isinstance(weapon_type, DumbMissile):
-            self.image = pygame.image.load("assets/pu_missile1.png")  
+            self.image = assets.image("assets/pu_missile1.png")  
         elif isinstance(weapon_type, SmartMissile):
-            self.image = pygame.image.load("assets/pu_missile2.png")  
+            self.image = assets.image("assets/pu_missile2.png")  
         self.rect = self.image.get_rect()
         self.rect.center = (x, y)
         self.weapon_type = weapon_type.copy()
         
 # Base class for player and enemies
-class Entity(pygame.sprite.Sprite):
+class Entity(SlotSprite):
+    __slots__ = ("frame", "original_image", "image_key", "speed", "move_x", "move_y", "angle",
+                 "health", "max_health", "weapon", "last_shot", "bar_health", "bar_fill")
+
     def __init__(self, image_path, health, weapon=None):
         super().__init__()
-        self.original_image = pygame.image.load(image_path).convert_alpha()
-        self.image = self.original_image.copy()
+        self.original_image = assets.image(image_path)
+        self.image_key = image_path  # Rotation cache key shared by every ship using this image
+        self.image = self.original_image
         self.rect = self.image.get_rect()
         self.speed = 0.4
         self.move_x = 0
@@ -461,12 +2073,11 @@ class Entity(pygame.sprite.Sprite):
         self.health = health
         self.max_health = health
         self.weapon = weapon
-        self.last_shot = 0  # Initialize last_shot to 0
+        self.last_shot = -math.inf  # Allow the first shot immediately
         
     def update(self):
         apply_movement(self)  # Apply accumulated movement
-        self.image = pygame.transform.rotozoom(self.original_image, self.angle, 1)
-        self.rect = self.image.get_rect(center=self.rect.center)
+        rotate_sprite(self, self.angle)
 
         # Wrap around screen edges
         if self.rect.left > SCREEN_WIDTH:
@@ -479,36 +2090,45 @@ class Entity(pygame.sprite.Sprite):
             self.rect.top = SCREEN_HEIGHT
             
     def shoot(self):
-        current_time = time.time()
+        current_time = sim_clock.now()
         if self.weapon and (current_time - self.last_shot >= self.weapon.shoot_delay):
-            # Create an instance of the weapon directly, with correct positioning and orientation
-            new_weapon_instance = type(self.weapon)(
-                self.rect.centerx, 
-                self.rect.centery, 
-                self.angle,
-                type(self)
-            )
+            if projectile_engine.enabled:
+                side = PLAYER_SIDE if isinstance(self, Player) else ENEMY_SIDE
+                projectile_engine.spawn(type(self.weapon), self.rect.centerx, self.rect.centery, self.angle, side)
+            else:
+                # Take a projectile from the weapon's pool, with correct positioning and orientation
+                new_weapon_instance = pools[type(self.weapon)].acquire(
+                    self.rect.centerx, 
+                    self.rect.centery, 
+                    self.angle,
+                    type(self)
+                )
+                if new_weapon_instance is None:
+                    return  # Pool is full and drops overflow
+
+                all_sprites.add(new_weapon_instance)
+                if isinstance(self, Player):
+                    lasers.add(new_weapon_instance)
+                elif isinstance(self, Enemy):
+                    enemy_lasers.add(new_weapon_instance)
                 
-            # Play firing sound for the player's weapon
+            # Play the weapon's firing sound, the player's own shots win over enemy fire
+            priority = AUDIO_PLAYER_PRIORITY if isinstance(self, Player) else 0
             if isinstance(self.weapon, GreenLaser):
-                fire_sound1.play()
+                audio.play("fire_green", self.rect.center, priority, listener_position())
             elif isinstance(self.weapon, BlueLaser):
-                fire_sound2.play()
+                audio.play("fire_blue", self.rect.center, priority, listener_position())
             elif isinstance(self.weapon, DumbMissile):
-                fire_sound3.play()
+                audio.play("fire_dumb_missile", self.rect.center, priority, listener_position())
             elif isinstance(self.weapon, SmartMissile):
-                fire_sound4.play()
-                
-            all_sprites.add(new_weapon_instance)
-            if isinstance(self, Player):
-                lasers.add(new_weapon_instance)
-            elif isinstance(self, Enemy):
-                enemy_lasers.add(new_weapon_instance)
+                audio.play("fire_smart_missile", self.rect.center, priority, listener_position())
             
             self.last_shot = current_time
 
 # Player class
 class Player(Entity):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("assets/player.png", 100, GreenLaser)
         
@@ -520,14 +2140,15 @@ class Player(Entity):
 
     def update(self):
         # Handle rotation and movement
-        keys = pygame.key.get_pressed()
+        keys = input_source.get_pressed()
         if keys[pygame.K_a]:
             self.angle += 0.2
         if keys[pygame.K_d]:
             self.angle -= 0.2
         if keys[pygame.K_w]:
-            self.move_x -= self.speed * math.sin(math.radians(self.angle))
-            self.move_y -= self.speed * math.cos(math.radians(self.angle))
+            sin, cos = heading_vector(self.angle)
+            self.move_x -= self.speed * sin
+            self.move_y -= self.speed * cos
 
         super().update()  # Call Entity's update method 
 
@@ -537,34 +2158,23 @@ class Player(Entity):
 
 # Enemy class
 class Enemy(Entity):
+    __slots__ = ("start_shooting_time", "steer_x", "steer_y", "heading", "aim_angle", "shoot_delay")
+
     def __init__(self, image_path, health, speed, weapon=None):
         super().__init__(image_path, health, weapon)
         self.speed = speed
-        self.start_shooting_time = time.time() + random.randint(5, 10)
+        self.start_shooting_time = sim_clock.now() + rng.randint(5, 10)
+
+        # Written by steer_enemies() each tick
+        self.steer_x = 0
+        self.steer_y = 0
+        self.heading = 0
+        self.aim_angle = 0
 
     def update(self):
-        # Calculate distances considering screen wrap-around
-        dx = player.rect.centerx - self.rect.centerx
-        dy = player.rect.centery - self.rect.centery
-        dx_wrapped = min(abs(dx), SCREEN_WIDTH - abs(dx))
-        dy_wrapped = min(abs(dy), SCREEN_HEIGHT - abs(dy))
-        dist_wrapped = math.hypot(dx_wrapped, dy_wrapped)
-
-        # Choose movement direction based on shortest distance
-        if dist_wrapped < math.hypot(dx, dy):
-            if abs(dx_wrapped) < abs(dx):
-                dx = dx - SCREEN_WIDTH
-            if abs(dy_wrapped) < abs(dy):
-                dy = dy - SCREEN_HEIGHT
-
-        # Normalize vector to get direction
-        dist = math.hypot(dx, dy)
-        dx /= dist
-        dy /= dist
-
-        # Move towards player
-        self.move_x += dx * self.speed
-        self.move_y += dy * self.speed
+        # Move towards player along the direction from the batched steering pass
+        self.move_x += self.steer_x * self.speed
+        self.move_y += self.steer_y * self.speed
 
         # Apply accumulated movement to rect
         self.rect.x += int(self.move_x)
@@ -572,10 +2182,8 @@ class Enemy(Entity):
         self.rect.y += int(self.move_y)
         self.move_y -= int(self.move_y)
 
-        # Calculate angle towards player and rotate image
-        angle = (180 / math.pi) * math.atan2(-dx, -dy)
-        self.image = pygame.transform.rotozoom(self.original_image, angle, 1)
-        self.rect = self.image.get_rect(center=self.rect.center)
+        # Face the player
+        rotate_sprite(self, self.heading)
 
         # Wrap around screen edges
         if self.rect.left > SCREEN_WIDTH:
@@ -589,26 +2197,29 @@ class Enemy(Entity):
 
         # Shooting logic (simplified)
         if self.weapon:  # Check if the enemy has a weapon
-            # Recalculate dx and dy for accurate aiming
-            dx = player.rect.centerx - self.rect.centerx
-            dy = player.rect.centery - self.rect.centery
-
-            self.angle = (180 / math.pi) * math.atan2(-dx, -dy)
+            self.angle = self.aim_angle
             self.shoot()
 
     def shoot(self):
-        current_time = time.time()
+        current_time = sim_clock.now()
         if current_time >= self.start_shooting_time:  # Check if the current time is past the shooting start time
             super().shoot()  # Call the shoot method of the base class if the delay has elapsed
 
     def enemy_death(self):
+        global score, kills
+        kills += 1
+        score += self.max_health  # Tougher enemies, and later waves, are worth more
+
         # Logic to drop HP power-up
-        r = random.randint(1, 10)
+        r = rng.randint(1, 10)
         if r <= 3:  
             x, y = self.rect.center
             hp_power_up = HPPowerUp(x, y)
             all_sprites.add(hp_power_up)
             power_ups.add(hp_power_up)
+            collision_grid.insert(hp_power_up)  # Collectable in this tick's pickup pass
+            if event_log.enabled:
+                log_spawn(hp_power_up)
             
         # Drop WeaponPowerUp
         elif r <= 10:
@@ -617,42 +2228,386 @@ class Enemy(Entity):
                 weapon_power_up = WeaponPowerUp(x, y, self.weapon)
                 all_sprites.add(weapon_power_up)
                 power_ups.add(weapon_power_up) 
+                collision_grid.insert(weapon_power_up)
+                if event_log.enabled:
+                    log_spawn(weapon_power_up)
 
         # Show explosion
-        explosion = Explosion(self.rect.center)
-        all_sprites.add(explosion)
-        explosion_sound.play()
+        explosion = pools[Explosion].acquire(self.rect.center)
+        if explosion is not None:  # A full pool drops the explosion, the death still counts
+            all_sprites.add(explosion)
+        audio.play("explosion", self.rect.center, listener=listener_position())
+
+# Enemy stats: image, health, speed and weapon, scaled per wave by the spawner
+ENEMY_TYPES = {
+    "rammer": ("assets/enemy1.png", 100, .2, None),
+    "gunner": ("assets/enemy2.png", 160, .03, GreenLaser),
+    "lancer": ("assets/enemy3.png", 240, .04, BlueLaser),
+    "bomber": ("assets/enemy4.png", 120, .05, DumbMissile),
+    "hunter": ("assets/enemy5.png", 120, .06, SmartMissile),
+}
+
+# Function to render every rotation of the ships and projectiles once assets are loaded, so play never rotozooms
+def prerender_rotations():
+    ships = ["assets/player.png"] + sorted({image_path for image_path, _, _, _ in ENEMY_TYPES.values()})
+    for path in ships:
+        rotation_cache.prerender(path, assets.image(path))
+    for cls in (GreenLaser, BlueLaser, DumbMissile, SmartMissile):
+        shot = cls(0, 0, 0, Enemy)
+        rotation_cache.prerender(shot.image_key, shot.original_image)
+
+# Spawns waves from the WAVES table, placing enemies on free spatial-hash cells a few per tick
+class WaveSpawner:
+    def __init__(self, cell_size, min_distance, max_distance):
+        self.cell_size = cell_size
+        # Cell-aligned offsets from the player that fall inside the spawn ring
+        reach = max_distance // cell_size
+        self.offsets = [
+            (dx * cell_size, dy * cell_size)
+            for dx in range(-reach, reach + 1)
+            for dy in range(-reach, reach + 1)
+            if min_distance <= math.hypot(dx, dy) * cell_size <= max_distance
+        ]
+        self.reset()
+
+    def reset(self):
+        self.wave = 0
+        self.pending = deque()
+        self.next_wave_at = None
+        self.blocked = False  # Set while a full spawn ring holds back the queue
+
+    # Spawn entries (type, health scale, speed scale) for a wave, types interleaved like the original spawner
+    def plan(self, wave):
+        counts = WAVES[min(wave, len(WAVES)) - 1]
+        extra = max(0, wave - len(WAVES)) * WAVE_COUNT_STEP
+        health_scale = 1 + WAVE_HEALTH_STEP * (wave - 1)
+        speed_scale = 1 + WAVE_SPEED_STEP * (wave - 1)
+        entries = []
+        for i in range(max(counts.values()) + extra):
+            for name, count in counts.items():
+                if i < count + extra:
+                    entries.append((name, health_scale, speed_scale))
+        return entries
+
+    def start_wave(self):
+        self.wave += 1
+        self.pending.extend(self.plan(self.wave))
+        if event_log.enabled:
+            event_log.emit("wave", EVENT_INFO, wave=self.wave, enemies=len(self.pending))
+
+    # Place up to limit queued enemies, all of them by default; ones with no free cell wait for a later tick
+    def place(self, limit=None):
+        placed = 0
+        while self.pending and (limit is None or placed < limit):
+            if not self.spawn(self.pending[0]):
+                if not self.blocked and event_log.enabled:
+                    event_log.emit("spawn_blocked", EVENT_WARNING, wave=self.wave, waiting=len(self.pending))
+                self.blocked = True
+                break
+            self.pending.popleft()
+            self.blocked = False
+            placed += 1
+        return placed
+
+    # Called every tick: place queued enemies, or schedule the next wave once the field is clear
+    def update(self, enemies_left):
+        if self.pending:
+            self.place(SPAWNS_PER_TICK)
+        elif not enemies_left:
+            if self.next_wave_at is None:
+                self.next_wave_at = sim_clock.now() + WAVE_DELAY
+            elif sim_clock.now() >= self.next_wave_at:
+                self.next_wave_at = None
+                self.start_wave()
+
+    # Add the enemy for a queued entry, False when the spawn ring has no free cell
+    def spawn(self, entry):
+        name, health_scale, speed_scale = entry
+        image_path, health, speed, weapon_class = ENEMY_TYPES[name]
+        position = self.free_position(player.rect.center)
+        if position is None:
+            return False  # Nothing is built or drawn from rng for an entry that has to wait
+        weapon = weapon_class(0, 0, 0, Enemy) if weapon_class else None
+        enemy = Enemy(image_path, round(health * health_scale), speed * speed_scale, weapon)
+        enemy.rect.center = position
+        all_sprites.add(enemy)
+        enemies.add(enemy)
+        collision_grid.insert(enemy)  # Later spawns this tick see the cell as taken
+        if event_log.enabled:
+            log_spawn(enemy)
+        return True
+
+    def is_free(self, cell):
+        return cell not in collision_grid.cells
+
+    # Centre of a grid cell in the spawn ring around origin that no sprite overlaps, wrapped onto the screen,
+    # or None when every cell in the ring is taken
+    def free_position(self, origin):
+        size = self.cell_size
+        px, py = origin
+        cols = SCREEN_WIDTH // size
+        rows = SCREEN_HEIGHT // size
+
+        def slot(offset):
+            cx = (px + offset[0]) % SCREEN_WIDTH // size % cols
+            cy = (py + offset[1]) % SCREEN_HEIGHT // size % rows
+            return cx, cy
+
+        # A few random probes almost always succeed, a full pass over the ring bounds the worst case
+        for _ in range(SPAWN_RANDOM_TRIES):
+            cell = slot(rng.choice(self.offsets))
+            if self.is_free(cell):
+                break
+        else:
+            start = rng.randrange(len(self.offsets))
+            for i in range(len(self.offsets)):
+                cell = slot(self.offsets[(start + i) % len(self.offsets)])
+                if self.is_free(cell):
+                    break
+            else:
+                return None
+        return cell[0] * size + size // 2, cell[1] * size + size // 2
+
+spawner = WaveSpawner(COLLISION_CELL_SIZE, ENEMY_SPAWN_DISTANCE, SCREEN_WIDTH // 2)
+
+# Pools of reusable projectiles and explosions
+pools = {
+    cls: ObjectPool(cls, POOL_CAPACITY, POOL_OVERFLOW)
+    for cls in (GreenLaser, BlueLaser, DumbMissile, SmartMissile, Explosion)
+}
 
 # Create sprite groups
-all_sprites = pygame.sprite.Group()
-enemies = pygame.sprite.Group()
-lasers = pygame.sprite.Group()
-enemy_lasers = pygame.sprite.Group()
-power_ups = pygame.sprite.Group()
-
-# Set screen dimensions
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-
-# Set game title
-pygame.display.set_caption("Survival Game")
-
-# Create player
-player = Player()
-all_sprites.add(player)
-
-# Create enemies
-create_enemies()
-
-# Game loop
-running = True
-game_start_time = time.time()
-while running:
-    if current_state == STATE_TITLE:
-        title_screen_func(screen)
-    elif current_state == STATE_PLAYING:
-        play_game(screen)
-    elif current_state == STATE_GAME_OVER:
-        game_over_screen(screen)
-    pygame.display.flip()
-
-pygame.quit()
\ No newline at end of file
+all_sprites = SlotGroup()
+enemies = SlotGroup()
+lasers = SlotGroup()
+enemy_lasers = SlotGroup()
+power_ups = SlotGroup()
+
+# Scoring for the current game, reset by reset_game()
+score = 0
+kills = 0
+
+# Function to open the game window
+def create_screen():
+    # Vsync needs a scaled display
+    if VSYNC:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED, vsync=1)
+    else:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    # Set game title
+    pygame.display.set_caption("Survival Game")
+    return screen
+
+# Loads the title, sprites and sounds on a worker thread while the window is already up
+class StartupLoader:
+    def __init__(self):
+        self.started = time.perf_counter()  # Module import, close enough to launch
+        self.marks = {}  # Startup milestones in seconds after launch
+        self.finished = threading.Event()
+        self.ready = False  # Images converted for the display, set on the main thread
+        self.start_requested = False
+        self.decoded = None
+        self.error = None
+        self.total = len(IMAGE_ASSETS) + 2  # Title screen, each image, then the sounds
+        self.done = 0
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.started
+
+    def start(self):
+        threading.Thread(target=self.run, name="startup-loader", daemon=True).start()
+
+    # Worker thread: decode only, surfaces are converted for the display on the main thread
+    def run(self):
+        try:
+            load_title_screen()
+            self.done = 1
+            self.decoded = assets.read(IMAGE_ASSETS, self.progress)
+            audio.load()
+            self.done = self.total
+        except Exception as e:  # Raised again on the main thread by finish()
+            self.error = e
+        self.mark("loaded")
+        self.finished.set()
+
+    # Called from AssetManager.read on the worker as each image is decoded, read by the loading screen
+    def progress(self, done, total, path):
+        self.done = 1 + done
+
+    def finish(self):
+        if self.ready:
+            return
+        self.finished.wait()
+        if self.error is not None:
+            raise self.error
+        assets.install(*self.decoded)
+        prerender_rotations()
+        self.ready = True
+        self.mark("assets_ready")
+        self.report()
+
+    def report(self):
+        assets.report()
+        for name, seconds in self.marks.items():
+            print(f"{seconds * 1000:8.2f} ms  {name}")
+
+startup = StartupLoader()
+
+# Function to run the windowed game
+def run_game():
+    global running
+    screen = create_screen()
+    startup.mark("window")
+
+    # Title, sprites and sounds load in the background, the title screen waits for them before play
+    startup.start()
+
+    use_input(KeyboardInput())
+
+    # Game loop
+    running = True
+    clock = pygame.time.Clock()
+    while running:
+        frame_time = clock.tick(MAX_FPS) / 1000  # Seconds since the last frame, sleeps to hold the cap
+        profiler.begin_frame()
+        if current_state == STATE_TITLE:
+            title_screen_func(screen)
+        elif current_state == STATE_PLAYING:
+            play_game(screen, frame_time)
+        elif current_state == STATE_GAME_OVER:
+            game_over_screen(screen)
+        with profiler.phase("flip"):
+            renderer.present()
+        startup.mark("first_frame")
+        profiler.end_frame()
+
+# Function to run the simulation without a window or sound device, as fast as the CPU allows
+def run_headless(ticks, render=False, script=DEFAULT_INPUT_SCRIPT):
+    global current_state
+
+    # Convert_alpha needs a display mode, even on the dummy driver
+    pygame.display.set_mode((1, 1))
+    assets.preload(IMAGE_ASSETS)
+    prerender_rotations()
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) if render else None
+
+    use_input(ScriptedInput(script))
+    reset_game()
+    current_state = STATE_PLAYING
+    games = 1
+    start = time.perf_counter()
+    for _ in range(ticks):
+        # Start a new game whenever the pilot dies
+        if current_state != STATE_PLAYING:
+            reset_game()
+            current_state = STATE_PLAYING
+            games += 1
+        profiler.begin_frame()
+        pygame.event.pump()
+        game_tick()
+        if render:
+            draw_game(screen, 1)
+            renderer.end_frame()
+        profiler.end_frame()
+    elapsed = time.perf_counter() - start
+
+    print(f"Headless: {ticks} ticks, {games} games in {elapsed:.2f} s "
+          f"({ticks / elapsed:.0f} ticks/s, {ticks / TICK_RATE / elapsed:.1f}x real time)")
+    print(f"Tick time p50 {profiler.percentile(50):.3f}  p95 {profiler.percentile(95):.3f}  "
+          f"p99 {profiler.percentile(99):.3f} ms")
+    for name, value in runtime_stats().items():
+        print(f"{name}: {value}")
+
+# Function to re-run a recording headless, verifying its checksums along the way
+def run_replay(path):
+    global current_state, input_source, input_tape
+
+    replay = InputReplay(path)
+    if replay.sprite_projectiles != (not projectile_engine.enabled):
+        print("Warning: recorded with a different projectile engine setting, expect a desync")
+    pygame.display.set_mode((1, 1))
+    assets.preload(IMAGE_ASSETS)
+    prerender_rotations()
+
+    rng.seed(replay.seed)
+    input_source = input_tape = replay
+    reset_game()
+    current_state = STATE_PLAYING
+    games = 1
+    start = time.perf_counter()
+    while not replay.finished and replay.desync is None:
+        # The recording continues into the next game whenever the pilot dies
+        if current_state != STATE_PLAYING:
+            reset_game()
+            current_state = STATE_PLAYING
+            games += 1
+        game_tick()
+    elapsed = time.perf_counter() - start
+
+    print(f"Replay: {replay.ticks} ticks, {games} games in {elapsed:.2f} s "
+          f"({replay.ticks / TICK_RATE / elapsed:.1f}x real time)")
+    if replay.desync is not None:
+        tick, recorded, actual = replay.desync
+        print(f"Desync at tick {tick}: checksum {actual:08x}, recorded {recorded:08x}")
+        return False
+    print(f"{replay.verified} of {len(replay.checksums)} checksums match")
+    return True
+
+def main():
+    global input_tape
+
+    parser = argparse.ArgumentParser(description="Spaceship Survival")
+    parser.add_argument("--headless", action="store_true", help="run the simulation without a window or sound device")
+    parser.add_argument("--ticks", type=int, default=TICK_RATE * 60, help="simulation ticks to run headless")
+    parser.add_argument("--render", action="store_true", help="draw every headless tick to an offscreen surface")
+    parser.add_argument("--sprite-projectiles", action="store_true", help="simulate projectiles as sprites instead of NumPy arrays")
+    parser.add_argument("--full-redraw", action="store_true", help="flip the whole screen every frame")
+    parser.add_argument("--trace", metavar="PATH", help="write per-frame phase timings as Chrome trace-event JSON on exit")
+    parser.add_argument("--event-log", metavar="PATH", help="write game events as rotating JSON Lines")
+    parser.add_argument("--event-level", choices=EVENT_LEVELS, default="info", help="lowest event severity to record")
+    parser.add_argument("--event-sample", metavar="KIND=N", action="append", default=[],
+                        help="keep one in every N events of a kind, e.g. hit=10")
+    parser.add_argument("--seed", type=int, help="seed the gameplay random stream for a reproducible run")
+    parser.add_argument("--record", metavar="PATH", help="record the seed and every tick's input for replay")
+    parser.add_argument("--replay", metavar="PATH", help="re-run a recording headless and verify its checksums")
+    args = parser.parse_args()
+
+    if args.sprite_projectiles:
+        projectile_engine.enabled = False
+    if args.full_redraw:
+        renderer.enabled = False
+    if args.trace:
+        profiler.start_trace()
+    if args.event_log:
+        sample_rates = {kind: int(n) for kind, n in (item.split("=") for item in args.event_sample)}
+        event_log.open(args.event_log, EVENT_LEVELS[args.event_level], sample_rates)
+    if args.record:
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 64)
+        input_tape = InputRecorder(seed, not projectile_engine.enabled)
+        rng.seed(seed)
+    elif args.seed is not None:
+        rng.seed(args.seed)
+    init_pygame(args.headless or args.replay is not None)
+    ok = True
+    try:
+        if args.replay:
+            ok = run_replay(args.replay)
+        elif args.headless:
+            run_headless(args.ticks, args.render)
+        else:
+            run_game()
+    finally:
+        # Also reached through the sys.exit() in the quit handlers
+        if args.trace:
+            profiler.export_trace(args.trace)
+        event_log.close()
+        if args.record:
+            input_tape.save(args.record)
+    pygame.quit()
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,850 @@
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+import pygame
+
+# Clock, assets, caches, input, audio, rendering and the gameplay tables are shared with the sprite version
+import survival005 as base
+from survival005 import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, TICK_RATE, MAX_FPS, ROTATION_STEPS, HEADING_STEPS, SIN_TABLE, COS_TABLE,
+    PLAYER_SIDE, ENEMY_SIDE, HEALTH_BAR_X_OFFSET, HEALTH_BAR_Y_OFFSET, SMART_MISSILE_RETARGET_TICKS,
+    SMART_MISSILE_RETARGET_RATIO, COLLISION_CELL_SIZE, ENEMY_SPAWN_DISTANCE, ENEMY_TYPES, IMAGE_ASSETS,
+    STATE_TITLE, STATE_PLAYING, STATE_GAME_OVER, EVENT_INFO, BLACK, WHITE,
+    sim_clock, rng, assets, rotation_cache, renderer, profiler, event_log, text_cache, hud,
+)
+
+# Constants
+ARCHETYPE_CAPACITY = 256  # Initial rows per archetype table, doubled whenever it fills
+PLAYER_SPEED = 0.4
+PLAYER_TURN_RATE = 0.2  # Degrees per tick
+PLAYER_HEALTH = 100
+PLAYER_SHOOT_DELAY = .2
+MISSILE_TURN_RATE = .05  # Degrees per tick
+CRASH_DAMAGE = 100
+HP_PICKUP_HEALTH = 20
+PICKUP_SHOOT_DELAY_SCALE = .05  # A picked-up weapon fires at 5% of the enemy's delay
+EXPLOSION_TICKS = TICK_RATE // 2
+HP_PICKUP = -1  # Pickup kind of a health power-up, weapon power-ups use their weapon kind
+
+# Columns of each component, every archetype table stores the columns of its components side by side
+COMPONENTS = {
+    "transform": [("x", float), ("y", float), ("prev_x", float), ("prev_y", float), ("angle", float)],
+    "velocity": [("vx", float), ("vy", float), ("speed", float)],
+    "health": [("health", float), ("max_health", float)],
+    "weapon": [("weapon_kind", np.int8), ("shoot_delay", float), ("last_shot", float), ("fire_after", float)],
+    "renderable": [("image", np.int16), ("w", np.int32), ("h", np.int32)],
+    "lifetime": [("age", np.int32), ("max_age", float)],
+    "faction": [("side", np.int8)],
+    "damage": [("damage", float), ("kind", np.int8)],
+    "homing": [("target", np.int64), ("retarget_in", np.int32)],
+    "steering": [("steer_x", float), ("steer_y", float), ("aim", float)],
+    "pickup": [("pickup_kind", np.int8)],
+    "pilot": [("trigger", bool)],
+}
+
+# Archetypes of the ported game
+PLAYER = ("transform", "velocity", "health", "weapon", "renderable", "faction", "pilot")
+GUNSHIP = ("transform", "velocity", "health", "weapon", "renderable", "faction", "steering")
+RAMMER = ("transform", "velocity", "health", "renderable", "faction", "steering")
+PROJECTILE = ("transform", "velocity", "renderable", "lifetime", "faction", "damage")
+MISSILE = PROJECTILE + ("homing",)
+PICKUP = ("transform", "renderable", "pickup")
+EXPLOSION = ("transform", "renderable", "lifetime")
+
+WEAPON_CLASSES = [base.GreenLaser, base.BlueLaser, base.DumbMissile, base.SmartMissile]
+FIRE_SOUNDS = ["fire_green", "fire_blue", "fire_dumb_missile", "fire_smart_missile"]
+HIT_SOUNDS = ["hit_green", "hit_blue", "hit_missile", "hit_missile"]
+PICKUP_IMAGES = ["assets/pu_greenlaser.png", "assets/pu_bluelaser.png", "assets/pu_missile1.png", "assets/pu_missile2.png"]
+
+current_state = STATE_TITLE
+score = 0
+kills = 0
+
+# Dense struct-of-arrays table holding every entity that has exactly one set of components
+class Archetype:
+    def __init__(self, components):
+        self.components = frozenset(components)
+        self.fields = [("entity", np.int64), ("alive", bool)]
+        for name in sorted(self.components):
+            self.fields += COMPONENTS[name]
+        self.columns = {}
+        self.count = 0
+        self.capacity = 0
+        self.grow(ARCHETYPE_CAPACITY)
+
+    def grow(self, capacity):
+        for name, dtype in self.fields:
+            column = np.zeros(capacity, dtype=dtype)
+            old = self.columns.get(name)
+            if old is not None:
+                column[:self.count] = old[:self.count]
+            self.columns[name] = column
+        self.capacity = capacity
+
+    # Live view of one column
+    def __getitem__(self, name):
+        return self.columns[name][:self.count]
+
+    # Append n rows, values are scalars or arrays per column and unset columns start at zero
+    def add(self, n, values):
+        if self.count + n > self.capacity:
+            self.grow(max(self.capacity * 2, self.count + n))
+        rows = slice(self.count, self.count + n)
+        for name, _ in self.fields:
+            self.columns[name][rows] = values.get(name, 0)
+        self.columns["alive"][rows] = True
+        self.count += n
+        return rows
+
+    # Drop dead rows in one pass, order is kept so entity ids stay sorted
+    def compact(self):
+        n = self.count
+        keep = self.columns["alive"][:n].copy()  # The alive column is compacted along with the rest
+        if keep.all():
+            return
+        count = int(np.count_nonzero(keep))
+        for column in self.columns.values():
+            column[:count] = column[:n][keep]
+        self.count = count
+
+# All archetype tables plus the images their renderables refer to
+class World:
+    def __init__(self):
+        self.archetypes = {}
+        self.next_entity = 0
+        self.image_keys = []
+        self.image_surfs = []
+        self.image_ids = {}
+        self.frame_w = None  # Rotated frame size per image and rotation step, for bounds and drawing
+        self.frame_h = None
+
+    def clear(self):
+        self.archetypes = {}
+
+    def archetype(self, components):
+        key = frozenset(components)
+        table = self.archetypes.get(key)
+        if table is None:
+            table = Archetype(key)
+            self.archetypes[key] = table
+        return table
+
+    def spawn(self, components, n=1, **values):
+        ids = np.arange(self.next_entity, self.next_entity + n)
+        self.next_entity += n
+        self.archetype(components).add(n, dict(values, entity=ids))
+        return ids
+
+    # Archetypes that have every listed component and at least one row
+    def query(self, *components):
+        required = set(components)
+        return [table for table in self.archetypes.values() if required <= table.components and table.count]
+
+    def count(self, *components):
+        return sum(table.count for table in self.query(*components))
+
+    def compact(self):
+        for table in self.archetypes.values():
+            table.compact()
+
+    # Register an image for renderables and measure its frames once, only images that rotate get every rotation
+    def register_image(self, key, surf, rotates):
+        if key in self.image_ids:
+            return self.image_ids[key]
+        self.image_ids[key] = len(self.image_keys)
+        self.image_keys.append(key)
+        self.image_surfs.append(surf)
+        if rotates:
+            rotation_cache.prerender(key, surf)
+            sizes = [rotation_cache.get(key, surf, step * 360 / ROTATION_STEPS).rect.size for step in range(ROTATION_STEPS)]
+        else:
+            sizes = [rotation_cache.get(key, surf, 0).rect.size] * ROTATION_STEPS  # Always drawn upright
+        sizes = np.array(sizes, dtype=np.int32).reshape(1, ROTATION_STEPS, 2)
+        self.frame_w = sizes[..., 0] if self.frame_w is None else np.vstack([self.frame_w, sizes[..., 0]])
+        self.frame_h = sizes[..., 1] if self.frame_h is None else np.vstack([self.frame_h, sizes[..., 1]])
+        return self.image_ids[key]
+
+world = World()
+
+# Time spent and entities processed by each system, for the throughput report
+class SystemStats:
+    def __init__(self):
+        self.seconds = {}
+        self.entities = {}
+        self.ticks = 0
+
+    def run(self, name, system):
+        start = time.perf_counter()
+        with profiler.phase(name):
+            processed = system()
+        self.seconds[name] = self.seconds.get(name, 0) + time.perf_counter() - start
+        self.entities[name] = self.entities.get(name, 0) + processed
+
+    def report(self):
+        print(f"{'system':<12}{'us/tick':>10}{'entities/tick':>15}{'M entities/s':>14}")
+        for name, seconds in self.seconds.items():
+            entities = self.entities[name]
+            rate = entities / seconds / 1e6 if seconds else 0
+            print(f"{name:<12}{seconds / self.ticks * 1e6:>10.1f}{entities / self.ticks:>15.1f}{rate:>14.2f}")
+
+system_stats = SystemStats()
+
+# Per-kind weapon stats, read from the sprite version's weapon classes
+class WeaponKinds:
+    def load(self):
+        templates = [cls(0, 0, 0, base.Enemy) for cls in WEAPON_CLASSES]
+        self.index = {cls: i for i, cls in enumerate(WEAPON_CLASSES)}
+        self.speed = np.array([t.speed for t in templates])
+        self.damage = np.array([t.damage for t in templates], dtype=float)
+        self.range = np.array([t.range for t in templates], dtype=float)
+        self.shoot_delay = np.array([t.shoot_delay for t in templates], dtype=float)
+        self.homing = np.array([cls is base.SmartMissile for cls in WEAPON_CLASSES])
+        self.beam = np.array([t.beam for t in templates])
+        self.half_length = np.array([t.original_image.get_height() / 2 for t in templates])
+        self.half_width = np.array([t.original_image.get_width() / 2 for t in templates])
+        self.image = np.array([world.register_image(t.image_key, t.original_image, True) for t in templates])
+
+weapon_kinds = WeaponKinds()
+
+# Function to register every image the world draws once assets are loaded, so no frame is rendered mid-game
+def load_images():
+    if world.image_keys:
+        return
+    ships = ["assets/player.png"] + sorted({image_path for image_path, _, _, _ in ENEMY_TYPES.values()})
+    for path in ships:
+        world.register_image(path, assets.image(path), True)
+    weapon_kinds.load()
+    for path in ["assets/hp1.png", "assets/explosion.png"] + PICKUP_IMAGES:
+        world.register_image(path, assets.image(path), False)
+
+# Function to look up the velocity of a heading, vectorized over the sprite version's sin/cos table
+heading_sin = np.array(SIN_TABLE)
+heading_cos = np.array(COS_TABLE)
+
+def heading_velocity(angle, speed):
+    step = np.rint(angle * (HEADING_STEPS / 360)).astype(np.int64) % HEADING_STEPS
+    return -speed * heading_sin[step], -speed * heading_cos[step]
+
+# Function to give the player table, which always holds the one player row while a game runs
+def player_table():
+    return world.archetype(PLAYER)
+
+# Function to give the point sounds are heard from, the player entity while it is alive
+def listener_position():
+    player = player_table()
+    if not player.count or not player["alive"][0]:
+        return None
+    return float(player["x"][0]), float(player["y"][0])
+
+# Waves from the shared WAVES table, placed on cells no entity bounds overlap
+class EcsSpawner(base.WaveSpawner):
+    def reset(self):
+        super().reset()
+        self.occupied = set()
+
+    def update(self, enemies_left):
+        if self.pending:
+            self.occupied = occupied_cells(self.cell_size)
+        super().update(enemies_left)
+
+    def is_free(self, cell):
+        return cell not in self.occupied
+
+    def spawn(self, entry):
+        name, health_scale, speed_scale = entry
+        image_path, health, speed, weapon_class = ENEMY_TYPES[name]
+        player = player_table()
+        position = self.free_position((int(player["x"][0]), int(player["y"][0])))
+        if position is None:
+            return False
+        x, y = position
+        self.occupied.add((x // self.cell_size, y // self.cell_size))
+        values = dict(
+            x=x, y=y, prev_x=x, prev_y=y,
+            speed=speed * speed_scale,
+            health=round(health * health_scale), max_health=round(health * health_scale),
+            image=world.image_ids[image_path],
+            side=ENEMY_SIDE,
+        )
+        if weapon_class is None:
+            world.spawn(RAMMER, **values)
+        else:
+            kind = weapon_kinds.index[weapon_class]
+            world.spawn(GUNSHIP, weapon_kind=kind, shoot_delay=weapon_kinds.shoot_delay[kind], last_shot=-math.inf,
+                        fire_after=sim_clock.now() + rng.randint(5, 10), **values)
+        if event_log.enabled:
+            event_log.emit("spawn", base.EVENT_DEBUG, sprite=name, x=x, y=y)
+        return True
+
+spawner = EcsSpawner(COLLISION_CELL_SIZE, ENEMY_SPAWN_DISTANCE, SCREEN_WIDTH // 2)
+
+# Function to compute the integer bounds of every row in a table from its centre and rotated frame size
+def bounds(table):
+    left = np.floor(table["x"] - table["w"] / 2).astype(np.int64)
+    top = np.floor(table["y"] - table["h"] / 2).astype(np.int64)
+    return left, top, left + table["w"], top + table["h"]
+
+# Function to list the spatial-hash cells overlapped by any entity, used for spawn placement
+def occupied_cells(size):
+    cells = set()
+    for table in world.query("transform", "renderable"):
+        left, top, right, bottom = bounds(table)
+        for x0, x1 in ((left, left), (left, right - 1), (right - 1, right - 1)):
+            cells.update(zip((x0 // size).tolist(), (top // size).tolist()))
+            cells.update(zip((x1 // size).tolist(), ((bottom - 1) // size).tolist()))
+    return cells
+
+# Function to test every row of one table against every row of another, [i, j] is True where they overlap
+def overlaps(a, b):
+    al, at, ar, ab = bounds(a)
+    bl, bt, br, bb = bounds(b)
+    hit = (al[:, None] < br[None, :]) & (bl[None, :] < ar[:, None]) & \
+          (at[:, None] < bb[None, :]) & (bt[None, :] < ab[:, None])
+    return hit & a["alive"][:, None] & b["alive"][None, :]
+
+# Function to give the mask of the rotated frame a row is drawn with
+def frame_mask(table, i):
+    image = table["image"][i]
+    step = int(np.rint(table["angle"][i] * (ROTATION_STEPS / 360))) % ROTATION_STEPS
+    return rotation_cache.get(world.image_keys[image], world.image_surfs[image], step * 360 / ROTATION_STEPS).mask
+
+# Function to confirm the rect hits of ships against other, as the sprite version's narrowphase does:
+# beams against each ship's hit circle, missiles and crashing ships by frame masks
+def confirm_hits(ships, other, hit):
+    if not base.MASK_COLLISIONS:
+        return hit
+    i, j = np.nonzero(hit)
+    if not len(i):
+        return hit
+    base.narrowphase.candidates += len(i)
+    beam = weapon_kinds.beam[other["kind"][j]] if "damage" in other.components else np.zeros(len(i), dtype=bool)
+    touching = np.zeros(len(i), dtype=bool)
+
+    bi, bj = i[beam], j[beam]
+    if len(bi):
+        radius = np.array([base.narrowphase.radius(world.image_keys[image], world.image_surfs[image])
+                           for image in ships["image"][bi].tolist()])
+        heading = np.rint(other["angle"][bj] * (HEADING_STEPS / 360)).astype(np.int64) % HEADING_STEPS
+        sin = heading_sin[heading]
+        cos = heading_cos[heading]
+        kind = other["kind"][bj]
+        cx, cy = ships["x"][bi], ships["y"][bi]
+        x, y = other["x"][bj], other["y"][bj]
+        half_length = weapon_kinds.half_length[kind]
+        t = np.clip(-(cx - x) * sin - (cy - y) * cos, -half_length, half_length)
+        dx = cx - (x - t * sin)
+        dy = cy - (y - t * cos)
+        reach = radius + weapon_kinds.half_width[kind]
+        touching[beam] = dx * dx + dy * dy <= reach * reach
+
+    left_a, top_a, _, _ = bounds(ships)
+    left_b, top_b, _, _ = bounds(other)
+    for k in np.nonzero(~beam)[0].tolist():
+        a, b = i[k], j[k]
+        offset = (int(left_b[b] - left_a[a]), int(top_b[b] - top_a[a]))
+        touching[k] = frame_mask(ships, a).overlap(frame_mask(other, b), offset) is not None
+
+    base.narrowphase.confirmed += np.count_nonzero(touching)
+    confirmed = np.zeros_like(hit)
+    confirmed[i[touching], j[touching]] = True
+    return confirmed
+
+# Function to start a new game
+def reset_world():
+    global score, kills
+    score = 0
+    kills = 0
+    world.clear()
+    sim_clock.reset()
+    spawner.reset()
+
+    kind = weapon_kinds.index[base.GreenLaser]
+    x, y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
+    world.spawn(PLAYER, x=x, y=y, prev_x=x, prev_y=y, speed=PLAYER_SPEED,
+                health=PLAYER_HEALTH, max_health=PLAYER_HEALTH,
+                weapon_kind=kind, shoot_delay=PLAYER_SHOOT_DELAY, last_shot=-math.inf,
+                image=world.image_ids["assets/player.png"], side=PLAYER_SIDE)
+
+    # The opening wave arrives all at once, as in the sprite version
+    spawner.start_wave()
+    spawner.occupied = occupied_cells(spawner.cell_size)
+    spawner.place()
+    world.compact()
+
+# Input system: turn, thrust and trigger of the piloted ship
+def input_system():
+    keys = base.input_source.get_pressed()
+    for table in world.query("pilot"):
+        if keys[pygame.K_a]:
+            table["angle"][:] += PLAYER_TURN_RATE
+        if keys[pygame.K_d]:
+            table["angle"][:] -= PLAYER_TURN_RATE
+        if keys[pygame.K_w]:
+            table["vx"][:], table["vy"][:] = heading_velocity(table["angle"], table["speed"])
+        else:
+            table["vx"][:] = 0
+            table["vy"][:] = 0
+        table["trigger"][:] = keys[pygame.K_SPACE]
+    return 1
+
+# Steering system: enemies head for the player along the shortest wrap-around path and aim straight at them
+def steering_system():
+    player = player_table()
+    tx, ty = player["x"][0], player["y"][0]
+    processed = 0
+    for table in world.query("steering"):
+        direct_x = tx - table["x"]
+        direct_y = ty - table["y"]
+        dx = (direct_x + SCREEN_WIDTH / 2) % SCREEN_WIDTH - SCREEN_WIDTH / 2
+        dy = (direct_y + SCREEN_HEIGHT / 2) % SCREEN_HEIGHT - SCREEN_HEIGHT / 2
+        dist = np.hypot(dx, dy)
+        dist[dist == 0] = 1
+        table["steer_x"][:] = dx / dist
+        table["steer_y"][:] = dy / dist
+        table["vx"][:] = table["steer_x"] * table["speed"]
+        table["vy"][:] = table["steer_y"] * table["speed"]
+        table["angle"][:] = np.degrees(np.arctan2(-table["steer_x"], -table["steer_y"]))
+        table["aim"][:] = np.degrees(np.arctan2(-direct_x, -direct_y))
+        processed += table.count
+    return processed
+
+# Function to gather every live enemy's id and position, sorted by id
+def enemy_positions():
+    tables = world.query("steering")
+    if not tables:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+    ids = np.concatenate([t["entity"] for t in tables])
+    x = np.concatenate([t["x"] for t in tables])
+    y = np.concatenate([t["y"] for t in tables])
+    alive = np.concatenate([t["alive"] for t in tables])
+    order = np.argsort(ids[alive])
+    return ids[alive][order], x[alive][order], y[alive][order]
+
+# Homing system: missiles turn towards the player, or towards a cached nearest enemy for the player's own
+def homing_system():
+    player = player_table()
+    processed = 0
+    for table in world.query("homing"):
+        tx = np.full(table.count, player["x"][0])
+        ty = np.full(table.count, player["y"][0])
+        has_target = np.ones(table.count, dtype=bool)
+
+        own = table["side"] == PLAYER_SIDE
+        if own.any():
+            ids, ex, ey = enemy_positions()
+            target = table["target"]
+            row = np.searchsorted(ids, target)
+            row[row >= len(ids)] = 0
+            known = own & (target >= 0) & (len(ids) > 0)
+            if len(ids):
+                known &= ids[row] == target
+            table["retarget_in"][own] -= 1
+
+            # Look again when the countdown runs out or the target is gone
+            look = own & ((table["retarget_in"] <= 0) | ~known)
+            if look.any() and len(ids):
+                mx, my = table["x"][look], table["y"][look]
+                dist = np.hypot(ex[None, :] - mx[:, None], ey[None, :] - my[:, None])
+                nearest = dist.argmin(axis=1)
+                best = dist[np.arange(len(nearest)), nearest]
+                current = np.where(known[look], np.hypot(ex[row[look]] - mx, ey[row[look]] - my), math.inf)
+                switch = ~known[look] | (best < current * SMART_MISSILE_RETARGET_RATIO)
+                chosen = np.where(switch, ids[nearest], target[look])
+                target[look] = chosen
+                table["retarget_in"][look] = SMART_MISSILE_RETARGET_TICKS
+                row[look] = np.searchsorted(ids, chosen)
+                known[look] = True
+            elif look.any():
+                target[look] = -1
+            tx[own] = ex[row[own]] if len(ids) else 0
+            ty[own] = ey[row[own]] if len(ids) else 0
+            has_target[own] = known[own]
+
+        idx = np.nonzero(has_target)[0]
+        dx = tx[idx] - table["x"][idx]
+        dy = ty[idx] - table["y"][idx]
+        angle_to_target = np.degrees(np.arctan2(-dy, dx)) - 90  # Align with Pygame's y-axis direction
+        angle_to_target[angle_to_target < 0] += 360
+        angle_diff = (angle_to_target - table["angle"][idx] + 180) % 360 - 180
+        table["angle"][idx] += np.clip(angle_diff, -MISSILE_TURN_RATE, MISSILE_TURN_RATE)
+        table["vx"][idx], table["vy"][idx] = heading_velocity(table["angle"][idx], table["speed"][idx])
+        processed += table.count
+    return processed
+
+# Movement system: integrate velocity, ships wrap around the screen edges
+def movement_system():
+    processed = 0
+    for table in world.query("transform", "velocity"):
+        table["prev_x"][:] = table["x"]
+        table["prev_y"][:] = table["y"]
+        table["x"][:] += table["vx"]
+        table["y"][:] += table["vy"]
+        processed += table.count
+    for table in world.query("transform", "health"):
+        x, y, half_w, half_h = table["x"], table["y"], table["w"] / 2, table["h"] / 2
+        x[x - half_w > SCREEN_WIDTH] = -half_w[x - half_w > SCREEN_WIDTH]
+        x[x + half_w < 0] = SCREEN_WIDTH + half_w[x + half_w < 0]
+        y[y - half_h > SCREEN_HEIGHT] = -half_h[y - half_h > SCREEN_HEIGHT]
+        y[y + half_h < 0] = SCREEN_HEIGHT + half_h[y + half_h < 0]
+        # A wrapped ship jumps, it is not drawn sliding across the screen
+        jumped = np.abs(x - table["prev_x"]) > SCREEN_WIDTH / 2
+        table["prev_x"][jumped] = x[jumped]
+        jumped = np.abs(y - table["prev_y"]) > SCREEN_HEIGHT / 2
+        table["prev_y"][jumped] = y[jumped]
+    return processed
+
+# Bounds system: size of every renderable's rotated frame at its current angle
+def bounds_system():
+    processed = 0
+    for table in world.query("transform", "renderable"):
+        step = np.rint(table["angle"] * (ROTATION_STEPS / 360)).astype(np.int64) % ROTATION_STEPS
+        table["w"][:] = world.frame_w[table["image"], step]
+        table["h"][:] = world.frame_h[table["image"], step]
+        processed += table.count
+    return processed
+
+# Lifetime system: age projectiles and explosions, projectiles also end when they leave the screen
+def lifetime_system():
+    processed = 0
+    for table in world.query("lifetime"):
+        table["age"][:] += 1
+        table["alive"][:] &= table["age"] <= table["max_age"]
+        processed += table.count
+    for table in world.query("damage"):
+        left, top, right, bottom = bounds(table)
+        table["alive"][:] &= ~((bottom < 0) | (top > SCREEN_HEIGHT) | (left > SCREEN_WIDTH) | (right < 0))
+    return processed
+
+# Function to add projectiles of one weapon kind
+def spawn_projectiles(kind, x, y, angle, side):
+    n = len(x)
+    speed = weapon_kinds.speed[kind]
+    vx, vy = heading_velocity(angle, speed)
+    world.spawn(MISSILE if weapon_kinds.homing[kind] else PROJECTILE, n,
+                x=x, y=y, prev_x=x, prev_y=y, angle=angle, vx=vx, vy=vy, speed=speed,
+                image=weapon_kinds.image[kind], max_age=weapon_kinds.range[kind] / speed,
+                side=side, damage=weapon_kinds.damage[kind], kind=kind, target=-1)
+
+# Firing system: every armed ship whose trigger is held and cooldown has passed fires its weapon
+def firing_system():
+    now = sim_clock.now()
+    processed = 0
+    for table in world.query("weapon"):
+        if "pilot" in table.components:
+            trigger = table["trigger"]
+            angle = table["angle"]
+            side = PLAYER_SIDE
+        else:
+            trigger = now >= table["fire_after"]
+            angle = table["aim"]
+            side = ENEMY_SIDE
+        ready = trigger & table["alive"] & (now - table["last_shot"] >= table["shoot_delay"])
+        processed += table.count
+        if not ready.any():
+            continue
+        table["last_shot"][ready] = now
+        for kind in np.unique(table["weapon_kind"][ready]).tolist():
+            shooters = ready & (table["weapon_kind"] == kind)
+            spawn_projectiles(kind, table["x"][shooters], table["y"][shooters], angle[shooters], side)
+            priority = base.AUDIO_PLAYER_PRIORITY if side == PLAYER_SIDE else 0
+            for x, y in zip(table["x"][shooters].tolist(), table["y"][shooters].tolist()):
+                base.audio.play(FIRE_SOUNDS[kind], (x, y), priority, listener_position())
+    return processed
+
+# Function to kill an enemy: drop a power-up, leave an explosion and score it
+def enemy_deaths(table, dead):
+    global score, kills
+    armed = "weapon" in table.components
+    for i in np.nonzero(dead)[0].tolist():
+        x, y = float(table["x"][i]), float(table["y"][i])
+        kills += 1
+        score += int(table["max_health"][i])
+        if event_log.enabled:
+            event_log.emit("kill", EVENT_INFO, target="Enemy", x=round(x), y=round(y))
+
+        r = rng.randint(1, 10)
+        if r <= 3:
+            world.spawn(PICKUP, x=x, y=y, prev_x=x, prev_y=y, pickup_kind=HP_PICKUP,
+                        image=world.image_ids["assets/hp1.png"])
+        elif armed:
+            kind = int(table["weapon_kind"][i])
+            world.spawn(PICKUP, x=x, y=y, prev_x=x, prev_y=y, pickup_kind=kind,
+                        image=world.image_ids[PICKUP_IMAGES[kind]])
+        world.spawn(EXPLOSION, x=x, y=y, prev_x=x, prev_y=y, max_age=EXPLOSION_TICKS,
+                    image=world.image_ids["assets/explosion.png"])
+        base.audio.play("explosion", (x, y), listener=listener_position())
+    table["alive"][dead] = False
+
+# Collision system: crashes, projectile hits on both sides and pickups, in the sprite version's order
+def collision_system():
+    player = player_table()
+    processed = world.count("renderable")
+    ships = world.query("steering")
+    projectiles = world.query("damage")
+
+    # Player against enemy ships, each crash destroys the enemy outright
+    for table in ships:
+        crashed = confirm_hits(player, table, overlaps(player, table))[0]
+        if crashed.any():
+            player["health"][0] -= CRASH_DAMAGE * np.count_nonzero(crashed)
+            table["alive"][crashed] = False
+            base.audio.play("collision")
+            if event_log.enabled:
+                event_log.emit("crash", EVENT_INFO, target="Player")
+
+    # Enemy projectiles against the player
+    for table in projectiles:
+        hit = confirm_hits(player, table, overlaps(player, table) & (table["side"] == ENEMY_SIDE)[None, :])[0]
+        if hit.any():
+            player["health"][0] -= table["damage"][hit].sum()
+            table["alive"][hit] = False
+            for kind in np.unique(table["kind"][hit]).tolist():
+                base.audio.play(HIT_SOUNDS[kind], (player["x"][0], player["y"][0]), listener=listener_position())
+
+    # Player projectiles against enemies, each projectile is spent on the first enemy it touches
+    for shots in projectiles:
+        mine = shots["side"] == PLAYER_SIDE
+        if not mine.any():
+            continue
+        for table in ships:
+            hit = confirm_hits(table, shots, overlaps(table, shots) & mine[None, :])
+            if not hit.any():
+                continue
+            struck = hit.any(axis=0)
+            first = hit.argmax(axis=0)[struck]
+            damage = np.bincount(first, weights=shots["damage"][struck], minlength=table.count)
+            shots["alive"][struck] = False
+            table["health"][:] -= damage
+            for kind in np.unique(shots["kind"][struck]).tolist():
+                i = first[shots["kind"][struck] == kind][0]
+                base.audio.play(HIT_SOUNDS[kind], (table["x"][i], table["y"][i]), listener=listener_position())
+
+    # Power-ups the player flies over
+    for table in world.query("pickup"):
+        taken = overlaps(player, table)[0]
+        for i in np.nonzero(taken)[0].tolist():
+            kind = int(table["pickup_kind"][i])
+            if kind == HP_PICKUP:
+                player["health"][0] = min(player["max_health"][0], player["health"][0] + HP_PICKUP_HEALTH)
+                base.audio.play("hp")
+            else:
+                player["weapon_kind"][0] = kind
+                player["shoot_delay"][0] = weapon_kinds.shoot_delay[kind] * PICKUP_SHOOT_DELAY_SCALE
+            if event_log.enabled:
+                event_log.emit("pickup", EVENT_INFO, power_up="HPPowerUp" if kind == HP_PICKUP else "WeaponPowerUp")
+        table["alive"][taken] = False
+    return processed
+
+# Damage system: ships whose health ran out this tick die, the player's death ends the game
+def damage_system():
+    global current_state
+    processed = 0
+    for table in world.query("health"):
+        dead = (table["health"] <= 0) & table["alive"]
+        processed += table.count
+        if not dead.any():
+            continue
+        if "pilot" in table.components:
+            table["alive"][dead] = False
+            if event_log.enabled:
+                event_log.emit("kill", EVENT_INFO, target="Player", x=round(table["x"][0]), y=round(table["y"][0]))
+            current_state = STATE_GAME_OVER
+        else:
+            enemy_deaths(table, dead)
+    return processed
+
+# Spawn system: queued wave arrivals and the next wave once the field is clear
+def spawn_system():
+    spawner.update(world.count("steering"))
+    return len(spawner.pending) + 1
+
+# Function to advance the world by one fixed tick
+def game_tick():
+    sim_clock.advance()
+    system_stats.ticks += 1
+    system_stats.run("input", input_system)
+    system_stats.run("steering", steering_system)
+    system_stats.run("homing", homing_system)
+    system_stats.run("movement", movement_system)
+    system_stats.run("bounds", bounds_system)
+    system_stats.run("lifetime", lifetime_system)
+    system_stats.run("firing", firing_system)
+    system_stats.run("bounds", bounds_system)  # New projectiles need bounds before they can hit
+    system_stats.run("collision", collision_system)
+    system_stats.run("damage", damage_system)
+    system_stats.run("spawn", spawn_system)
+    world.compact()
+
+# Render system: every renderable at its interpolated position, then the health bars
+def render_system(screen, alpha):
+    renderer.clear(screen)
+    blits = []
+    bars = []
+    drawn = 0
+    keys = world.image_keys
+    surfs = world.image_surfs
+    for table in world.query("renderable"):
+        x = table["prev_x"] + (table["x"] - table["prev_x"]) * alpha
+        y = table["prev_y"] + (table["y"] - table["prev_y"]) * alpha
+        step = np.rint(table["angle"] * (ROTATION_STEPS / 360)).astype(np.int64) % ROTATION_STEPS
+        for image, s, cx, cy in zip(table["image"].tolist(), step.tolist(), x.tolist(), y.tolist()):
+            frame = rotation_cache.get(keys[image], surfs[image], s * 360 / ROTATION_STEPS)
+            blits.append((frame.image, (round(cx - frame.rect.width / 2), round(cy - frame.rect.height / 2))))
+        if "health" in table.components:
+            for health, max_health, cx, cy in zip(table["health"].tolist(), table["max_health"].tolist(),
+                                                  x.tolist(), y.tolist()):
+                position = (round(cx) + HEALTH_BAR_X_OFFSET, round(cy) + HEALTH_BAR_Y_OFFSET)
+                bars.append((base.health_fill_surf(health, max_health), position))
+                bars.append((base.outline_surf, position))
+        drawn += table.count
+    renderer.add_all(screen.blits(blits))
+    renderer.add_all(screen.blits(bars))
+    return drawn
+
+# Function to draw one frame of the world
+def draw_game(screen, alpha):
+    system_stats.run("render", lambda: render_system(screen, alpha))
+
+# Function to handle the title screen, play only starts once the startup loader is done
+def title_screen_func(screen):
+    global current_state
+    renderer.invalidate()
+    screen.fill(BLACK)
+    if base.title_screen is not None:
+        screen.blit(base.title_screen, (0, 0))
+    if not base.startup.ready:
+        text = text_cache.render(f"Loading... {base.startup.done}/{base.startup.total}", 48, WHITE)
+        screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT - 80))
+    for event in pygame.event.get():
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+            base.startup.start_requested = True
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+    if base.startup.start_requested and base.startup.finished.is_set():
+        base.startup.start_requested = False
+        base.startup.finish()
+        load_images()
+        reset_world()
+        current_state = STATE_PLAYING
+
+# Function to handle the gameplay
+def play_game(screen, frame_time):
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+        if event.type == pygame.KEYDOWN and event.key == base.PROFILER_TOGGLE_KEY:
+            profiler.visible = not profiler.visible
+        if event.type == pygame.KEYDOWN and event.key == base.HUD_TOGGLE_KEY:
+            hud.visible = not hud.visible
+
+    sim_clock.accumulator += min(frame_time, base.MAX_FRAME_TIME)
+    while sim_clock.accumulator >= sim_clock.dt and current_state == STATE_PLAYING:
+        game_tick()
+        sim_clock.accumulator -= sim_clock.dt
+
+    draw_game(screen, sim_clock.accumulator / sim_clock.dt)
+    hud.frame(frame_time)
+    if hud.visible:
+        renderer.add_all(hud.draw(screen, {
+            "Score": score,
+            "Kills": kills,
+            "Wave": spawner.wave,
+            "FPS": hud.fps(),
+            "Enemies": world.count("steering"),
+            "Projectiles": world.count("damage"),
+        }))
+    if profiler.visible:
+        renderer.add(profiler.draw(screen, {"entities": sum(t.count for t in world.archetypes.values()),
+                                            "archetypes": len(world.archetypes)}))
+
+# Function to handle the game over screen
+def game_over_screen(screen):
+    global current_state
+    renderer.invalidate()
+    screen.fill(BLACK)
+    text = text_cache.render('Press Space to Continue', 74, WHITE)
+    screen.blit(text, (SCREEN_WIDTH // 2 - text.get_rect().width // 2, SCREEN_HEIGHT // 2))
+    for event in pygame.event.get():
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+            current_state = STATE_TITLE
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+
+# Function to run the windowed game
+def run_game():
+    screen = base.create_screen()
+    base.startup.mark("window")
+    base.startup.start()
+    base.use_input(base.KeyboardInput())
+
+    clock = pygame.time.Clock()
+    while True:
+        frame_time = clock.tick(MAX_FPS) / 1000
+        profiler.begin_frame()
+        if current_state == STATE_TITLE:
+            title_screen_func(screen)
+        elif current_state == STATE_PLAYING:
+            play_game(screen, frame_time)
+        elif current_state == STATE_GAME_OVER:
+            game_over_screen(screen)
+        with profiler.phase("flip"):
+            renderer.present()
+        base.startup.mark("first_frame")
+        profiler.end_frame()
+
+# Function to run the world without a window or sound device, then report per-system throughput
+def run_headless(ticks, render=False):
+    global current_state
+    pygame.display.set_mode((1, 1))
+    assets.preload(IMAGE_ASSETS)
+    load_images()
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) if render else None
+
+    base.use_input(base.ScriptedInput(base.DEFAULT_INPUT_SCRIPT))
+    reset_world()
+    current_state = STATE_PLAYING
+    games = 1
+    start = time.perf_counter()
+    for _ in range(ticks):
+        if current_state != STATE_PLAYING:
+            reset_world()
+            current_state = STATE_PLAYING
+            games += 1
+        profiler.begin_frame()
+        pygame.event.pump()
+        game_tick()
+        if render:
+            draw_game(screen, 1)
+            renderer.end_frame()
+        profiler.end_frame()
+    elapsed = time.perf_counter() - start
+
+    print(f"Headless ECS: {ticks} ticks, {games} games in {elapsed:.2f} s "
+          f"({ticks / elapsed:.0f} ticks/s, {ticks / TICK_RATE / elapsed:.1f}x real time)")
+    system_stats.report()
+
+def main():
+    parser = argparse.ArgumentParser(description="Spaceship Survival on an archetype entity-component-system")
+    parser.add_argument("--headless", action="store_true", help="run the simulation without a window or sound device")
+    parser.add_argument("--ticks", type=int, default=TICK_RATE * 60, help="simulation ticks to run headless")
+    parser.add_argument("--render", action="store_true", help="draw every headless tick to an offscreen surface")
+    parser.add_argument("--seed", type=int, help="seed the gameplay random stream for a reproducible run")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        rng.seed(args.seed)
+    base.init_pygame(args.headless)
+    if args.headless:
+        run_headless(args.ticks, args.render)
+    else:
+        run_game()
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()